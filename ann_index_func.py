@@ -0,0 +1,313 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from database_func import connect_db
+from embedding_func import get_provider
+from ranking_func import normalize_rows, top_k
+
+
+ANN_INDEX_PATH = "student_ann_index.npz"
+ANN_NPROBE = int(os.environ.get("SMARTMATCH_ANN_NPROBE", "32"))  # inverted lists scanned per search
+FLAT_THRESHOLD = 4096        # below this many students one exact scan is as fast as probing lists
+LISTS_PER_SQRT = 1           # nlist = LISTS_PER_SQRT * sqrt(n)
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64  # training points per list
+RETRAIN_GROWTH = 2.0         # retrain the coarse quantizer once the index doubled since training
+COMPACT_TAIL = 0.05          # merge added vectors into their lists once the tail is 5% of the index
+ASSIGN_BATCH = 65536
+
+
+def _nearest(vectors, centroids):
+    """Position of the nearest (highest inner product) centroid of every vector."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        batch = np.asarray(vectors[start:start + ASSIGN_BATCH], dtype=np.float32)
+        assign[start:start + ASSIGN_BATCH] = np.argmax(batch @ centroids.T, axis=1)
+    return assign
+
+
+def train_centroids(vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """Spherical k-means on a sample of unit vectors; returns (nlist, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=nlist) == 0
+        # an empty list gets a random sample point instead of staying unused
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file (IVF) index over unit vectors, scored by inner product (cosine).
+
+    Vectors are stored as float32, grouped by their nearest k-means centroid so
+    every inverted list is one contiguous slice; a search scores the nprobe
+    lists nearest the query exactly. With no centroids it is a flat index and
+    every search is exact. Upserted vectors go to a small unsorted tail that
+    every search scans until compact() sorts them into their lists; replaced
+    and removed vectors are masked until then.
+    """
+
+    def __init__(self, dim, centroids=None):
+        self.dim = dim
+        self.centroids = centroids
+        nlist = 1 if centroids is None else len(centroids)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(nlist + 1, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.trained_size = 0
+        self.tail = {}  # id -> unit float32 vector
+        self._tail_matrix = None
+        self._sorted_ids = None
+
+    def __len__(self):
+        return int(self.alive.sum()) + len(self.tail)
+
+    @property
+    def nlist(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, ids, vectors, nlist=None):
+        """Index ids with their vectors; trains nlist lists (default from the size) above FLAT_THRESHOLD."""
+        vectors = normalize_rows(vectors) if len(vectors) else np.empty((0, 0), dtype=np.float32)
+        if nlist is None:
+            nlist = max(1, int(LISTS_PER_SQRT * np.sqrt(len(ids)))) if len(ids) >= FLAT_THRESHOLD else 1
+        centroids = train_centroids(vectors, nlist) if nlist > 1 else None
+        index = cls(vectors.shape[1], centroids)
+        index._set_lists(np.asarray(ids, dtype=np.int64), vectors)
+        index.trained_size = len(ids)
+        return index
+
+    def _set_lists(self, ids, vectors):
+        assign = _nearest(vectors, self.centroids) if self.centroids is not None else np.zeros(len(ids), dtype=np.int32)
+        order = np.argsort(assign, kind="stable")
+        self.vectors = np.asarray(vectors, dtype=np.float32)[order]
+        self.ids = ids[order]
+        self.offsets = np.searchsorted(assign[order], np.arange(self.nlist + 1)).astype(np.int64)
+        self.alive = np.ones(len(ids), dtype=bool)
+        self._sorted_ids = None
+
+    def _positions(self, ids):
+        # positions of ids in the lists, -1 where absent
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self.ids) == 0:
+            return np.full(len(ids), -1)
+        if self._sorted_ids is None:
+            self._sorted_ids = np.argsort(self.ids, kind="stable")
+        found = np.minimum(np.searchsorted(self.ids, ids, sorter=self._sorted_ids), len(self.ids) - 1)
+        positions = self._sorted_ids[found]
+        return np.where(self.ids[positions] == ids, positions, -1)
+
+    def copy(self):
+        """A copy that can be changed while searches keep using this index; the list arrays are shared (never changed in place)."""
+        index = copy.copy(self)
+        index.alive = self.alive.copy()
+        index.tail = dict(self.tail)
+        return index
+
+    def remove(self, ids):
+        positions = self._positions(ids)
+        self.alive[positions[positions >= 0]] = False
+        for id_ in ids:
+            if self.tail.pop(int(id_), None) is not None:
+                self._tail_matrix = None
+
+    def upsert(self, ids, vectors):
+        self.remove(ids)
+        for id_, vector in zip(ids, normalize_rows(vectors)):
+            self.tail[int(id_)] = vector
+        self._tail_matrix = None
+
+    def compact(self):
+        """Sort the tail into its lists and drop masked vectors."""
+        keep = self.alive
+        ids = np.concatenate([self.ids[keep], np.fromiter(self.tail, dtype=np.int64, count=len(self.tail))])
+        parts = [self.vectors[keep]] + ([np.vstack(list(self.tail.values()))] if self.tail else [])
+        self.tail, self._tail_matrix = {}, None
+        self._set_lists(ids, np.vstack(parts) if len(ids) else np.empty((0, self.dim), dtype=np.float32))
+
+    def needs_compaction(self):
+        return len(self.tail) + (~self.alive).sum() > COMPACT_TAIL * max(len(self.ids), 1)
+
+    def needs_training(self):
+        if self.centroids is None:
+            return len(self) >= FLAT_THRESHOLD
+        return len(self) >= RETRAIN_GROWTH * max(self.trained_size, 1)
+
+    def search(self, query, k=50, nprobe=ANN_NPROBE):
+        """(ids, scores) of the k vectors most similar to query, best first; scores are cosine * 100."""
+        query = normalize_rows(query)[0]
+        if self.centroids is None or nprobe >= self.nlist:
+            lists = range(self.nlist)
+        else:
+            lists = top_k(self.centroids @ query, nprobe)
+
+        scores, ids = [], []
+        for list_id in lists:
+            start, end = self.offsets[list_id], self.offsets[list_id + 1]
+            if start == end:
+                continue
+            list_scores = self.vectors[start:end] @ query
+            alive = self.alive[start:end]
+            scores.append(list_scores[alive])
+            ids.append(self.ids[start:end][alive])
+        if self.tail:
+            if self._tail_matrix is None:
+                self._tail_matrix = (np.fromiter(self.tail, dtype=np.int64, count=len(self.tail)), np.vstack(list(self.tail.values())))
+            tail_ids, tail_vectors = self._tail_matrix
+            scores.append(tail_vectors @ query)
+            ids.append(tail_ids)
+        if not scores:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+        best = top_k(scores, k)
+        return ids[best], scores[best] * 100
+
+    def save(self, path, meta):
+        """Write the compacted index and meta (JSON-able dict) to path atomically."""
+        if self.tail or not self.alive.all():
+            self.compact()
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+        with os.fdopen(fd, "wb") as file:
+            np.savez(
+                file,
+                centroids=self.centroids if self.centroids is not None else np.empty((0, self.dim), dtype=np.float32),
+                vectors=self.vectors, ids=self.ids, offsets=self.offsets,
+                meta=np.array(json.dumps({**meta, "dim": self.dim, "trained_size": self.trained_size})),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """(index, meta) from a file written by save()."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            centroids = data["centroids"] if len(data["centroids"]) else None
+            index = cls(meta["dim"], centroids)
+            index.vectors, index.ids, index.offsets = data["vectors"], data["ids"], data["offsets"]
+        index.alive = np.ones(len(index.ids), dtype=bool)
+        index.trained_size = meta["trained_size"]
+        return index, meta
+
+
+# One index per process, shared by all sessions and reloaded only when another process rewrote the file.
+# A published index is never changed; sync_student_index swaps in an updated copy.
+_lock = threading.Lock()
+_state = {"index": None, "meta": None, "version": None, "seq": 0}
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_embeddings(rows, model):
+    # rows of (student_id, embedding_blob, features_model); other models' embeddings are not comparable
+    kept = [(student_id, blob) for student_id, blob, row_model in rows if blob is not None and row_model == model]
+    ids = np.fromiter((student_id for student_id, _ in kept), dtype=np.int64, count=len(kept))
+    vectors = np.frombuffer(b"".join(blob for _, blob in kept), dtype=np.float32).reshape(len(kept), -1) if kept else None
+    return ids, vectors
+
+
+def sync_student_index(path=ANN_INDEX_PATH):
+    """The ANN index over every student's resume embedding, brought up to date with `students`.
+
+    Changes are replayed from student_embedding_changes (filled by triggers) after the last
+    seq applied. The index file is only rewritten when the index is rebuilt (no file yet,
+    another embedding model, or it outgrew its coarse quantizer) or compacted; a process
+    loading it replays the changes made since. Returns the IVFIndex.
+    """
+    model = get_provider().name
+    conn = connect_db()
+    try:
+        with _lock:
+            version = _file_version(path)
+            if version is not None and version != _state["version"]:
+                index, meta = IVFIndex.load(path)
+                _state.update(index=index, meta=meta, version=version, seq=meta["seq"])
+            index, meta, applied = _state["index"], _state["meta"], _state["seq"]
+
+            seq = conn.execute("SELECT IFNULL(MAX(seq), 0) FROM student_embedding_changes").fetchone()[0]
+            if index is not None and meta["model"] == model and applied == seq:
+                return index
+
+            rebuild = index is None or meta["model"] != model or seq < applied
+            if not rebuild:
+                # search_students searches outside the lock: change a copy and publish it whole
+                index = index.copy()
+                rows = conn.execute(
+                    """
+                    SELECT c.student_id, s.resume_embedding, s.features_model
+                    FROM student_embedding_changes c LEFT JOIN students s ON s.student_id = c.student_id
+                    WHERE c.seq > ?
+                    """,
+                    (applied,),
+                ).fetchall()
+                ids, vectors = _read_embeddings(rows, model)
+                index.remove([row[0] for row in rows])
+                if len(ids) and index.dim == 0:
+                    rebuild = True
+                elif len(ids):
+                    index.upsert(ids, vectors)
+                rebuild = rebuild or index.needs_training()
+
+            if rebuild:
+                rows = conn.execute(
+                    "SELECT student_id, resume_embedding, features_model FROM students WHERE resume_embedding IS NOT NULL"
+                ).fetchall()
+                ids, vectors = _read_embeddings(rows, model)
+                index = IVFIndex.build(ids, vectors) if len(ids) else IVFIndex(0)
+            elif index.needs_compaction():
+                index.compact()
+            else:
+                _state.update(index=index, seq=seq)
+                return index
+
+            meta = {"model": model, "seq": seq}
+            index.save(path, meta)
+            _state.update(index=index, meta=meta, version=_file_version(path), seq=seq)
+            return index
+    finally:
+        conn.close()
+
+
+def search_students(query_embedding, k=50, nprobe=ANN_NPROBE, path=ANN_INDEX_PATH):
+    """The k students whose resume embeddings are closest to query_embedding, across all recruiters.
+
+    Returns dicts with student_code, name, email and score (cosine * 100), best first.
+    """
+    index = sync_student_index(path)
+    if len(index) == 0:
+        return []
+    ids, scores = index.search(query_embedding, k, nprobe)
+    conn = connect_db()
+    placeholders = ", ".join("?" * len(ids))
+    rows = conn.execute(
+        f"SELECT student_id, student_code, name, email FROM students WHERE student_id IN ({placeholders})",
+        [int(id_) for id_ in ids],
+    ).fetchall()
+    conn.close()
+    students = {row[0]: row[1:] for row in rows}
+    return [
+        {"student_code": students[id_][0], "name": students[id_][1], "email": students[id_][2], "score": float(score)}
+        for id_, score in zip(ids.tolist(), scores)
+        if id_ in students
+    ]
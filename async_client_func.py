@@ -0,0 +1,194 @@
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+EMBED_CONCURRENCY = int(os.environ.get("SMARTMATCH_EMBED_CONCURRENCY", "8"))  # embedding requests in flight
+EMBED_RPS = float(os.environ.get("SMARTMATCH_EMBED_RPS", "20"))  # sustained embedding requests per second
+LLM_CONCURRENCY = int(os.environ.get("SMARTMATCH_LLM_CONCURRENCY", "4"))
+LLM_RPS = float(os.environ.get("SMARTMATCH_LLM_RPS", "2"))
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds before the first retry, doubled on every further attempt
+BACKOFF_MAX = 30.0
+
+
+class RateLimitError(Exception):
+    """A 429 from the API; retry_after (seconds) is honoured when the server sent one."""
+
+    def __init__(self, message="rate limited", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(exc):
+    """Rate limits, overload and connection trouble are worth retrying; bad requests are not."""
+    if isinstance(exc, (RateLimitError, TimeoutError, ConnectionError)):
+        return True
+    # urllib wraps connection failures in URLError.reason
+    if isinstance(getattr(exc, "reason", None), (TimeoutError, ConnectionError)):
+        return True
+    # google.api_core exceptions carry the HTTP status in .code
+    code = getattr(exc, "code", None)
+    return code in (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average and bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        # after a 429 nobody sends until the server has had time to recover
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = now
+
+
+class AsyncClient:
+    """Bounded, throttled and retrying calls to a remote API.
+
+    At most `concurrency` calls run at once, starts are limited to `rate` per
+    second by a token bucket, and retryable failures are retried with
+    exponential backoff and jitter (a 429 pauses the whole bucket). Blocking
+    callables run in worker threads so the event loop keeps overlapping them.
+    """
+
+    def __init__(self, concurrency, rate, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "coalesced": 0}
+        # asyncio primitives belong to one loop; created lazily on the facade loop
+        self._semaphore = None
+        self._bucket = None
+        self._inflight = {}
+        # own threads, so the default executor's small size does not cap concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="smartmatch-client")
+
+    def _primitives(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(self.rate)
+        return self._semaphore, self._bucket
+
+    async def call(self, fn, *args, **kwargs):
+        semaphore, bucket = self._primitives()
+        attempt = 0
+        while True:
+            async with semaphore:
+                await bucket.acquire()
+                self.stats["calls"] += 1
+                try:
+                    if asyncio.iscoroutinefunction(fn):
+                        return await fn(*args, **kwargs)
+                    return await asyncio.get_running_loop().run_in_executor(
+                        self._executor, functools.partial(fn, *args, **kwargs)
+                    )
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                    if isinstance(e, RateLimitError) or getattr(e, "code", None) == 429:
+                        self.stats["rate_limited"] += 1
+                        delay = max(delay, getattr(e, "retry_after", None) or 0)
+                        bucket.pause(delay)
+            attempt += 1
+            self.stats["retries"] += 1
+            # sleep outside the semaphore so other calls can use the slot meanwhile
+            await asyncio.sleep(delay)
+
+    async def load_many(self, namespace, items, fetch, batch_size):
+        """Values for items ({key: payload}) via fetch(list of payloads) -> list of values.
+
+        Keys another caller is already fetching are awaited instead of requested
+        again; the rest are fetched batch_size at a time, all batches concurrently.
+        """
+        loop = asyncio.get_running_loop()
+        futures, todo = {}, []
+        for key in items:
+            future = self._inflight.get((namespace, key))
+            if future is None:
+                future = self._inflight[(namespace, key)] = loop.create_future()
+                todo.append(key)
+            else:
+                self.stats["coalesced"] += 1
+            futures[key] = future
+
+        async def run_batch(batch):
+            try:
+                values = await self.call(fetch, [items[key] for key in batch])
+                if len(values) != len(batch):
+                    # a short answer would leave the missing keys' futures, and their waiters, pending forever
+                    raise ValueError(f"fetch returned {len(values)} values for {len(batch)} items")
+            except Exception as e:
+                for key in batch:
+                    self._inflight.pop((namespace, key)).set_exception(e)
+                return
+            for key, value in zip(batch, values):
+                self._inflight.pop((namespace, key)).set_result(value)
+
+        await asyncio.gather(*(run_batch(todo[start:start + batch_size]) for start in range(0, len(todo), batch_size)))
+        # gather retrieves every failed future, not just the first one awaited
+        return dict(zip(futures, await asyncio.gather(*futures.values())))
+
+
+# Sync facade: one event loop in a daemon thread serves every caller in the process (Streamlit
+# sessions, job workers), so concurrency limits and rate limits are process-wide.
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run(loop):
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            threading.Thread(target=run, args=(_loop,), name="smartmatch-async", daemon=True).start()
+            ready.wait()
+        return _loop
+
+
+def run_sync(coro):
+    """Run a coroutine on the shared client loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+embedding_client = AsyncClient(EMBED_CONCURRENCY, EMBED_RPS)
+llm_client = AsyncClient(LLM_CONCURRENCY, LLM_RPS)
@@ -0,0 +1,71 @@
+"""Recall and latency of the student ANN index (IVF) against exact search, on synthetic students.
+
+Resume embeddings are drawn around a few thousand topic centres (students
+with similar skills land close together, as real skill embeddings do);
+queries are fresh draws from the same distribution. For each size the
+exact top-50 (float32 matrix-vector product over every student) is the
+ground truth for recall@50 of IVFIndex.search at several nprobe values.
+
+Run from the repository root: python benchmarks/bench_ann_index.py [sizes] [dim]
+e.g. python benchmarks/bench_ann_index.py 100000,1000000 128
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ann_index_func imports database_func and embedding_func, which create their databases in the working directory
+os.chdir(tempfile.mkdtemp())
+from ann_index_func import IVFIndex  # noqa: E402
+from ranking_func import normalize_rows, top_k  # noqa: E402
+
+K = 50
+N_QUERIES = 100
+NPROBES = (1, 4, 8, 16, 32, 64)
+
+
+def synthetic(rng, centres, n, spread=0.12, batch=100_000):
+    vectors = np.empty((n, centres.shape[1]), dtype=np.float32)
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        noise = rng.standard_normal((size, centres.shape[1]), dtype=np.float32) * spread
+        vectors[start:start + size] = centres[rng.integers(len(centres), size=size)] + noise
+    return normalize_rows(vectors)
+
+
+def main(sizes=(100_000, 1_000_000), dim=128):
+    rng = np.random.default_rng(0)
+    centres = normalize_rows(rng.standard_normal((2000, dim), dtype=np.float32)) * 1.5
+    for n in sizes:
+        vectors = synthetic(rng, centres, n)
+        queries = synthetic(rng, centres, N_QUERIES)
+
+        start = time.perf_counter()
+        truth = [set(top_k(vectors @ query, K).tolist()) for query in queries]
+        exact = (time.perf_counter() - start) / N_QUERIES
+
+        start = time.perf_counter()
+        index = IVFIndex.build(np.arange(n), vectors)
+        build = time.perf_counter() - start
+        del vectors
+
+        print(f"{n} students, dim {dim}: {index.nlist} lists, built in {build:.1f} s, "
+              f"{index.vectors.nbytes / 2 ** 20:.0f} MiB of vectors")
+        print(f"  exact (float32, all students)   {exact * 1000:8.2f} ms/query  recall@{K} 1.000")
+        for nprobe in NPROBES:
+            start = time.perf_counter()
+            results = [index.search(query, K, nprobe)[0] for query in queries]
+            latency = (time.perf_counter() - start) / N_QUERIES
+            recall = np.mean([len(expected.intersection(found.tolist())) / K for expected, found in zip(truth, results)])
+            print(f"  IVF nprobe={nprobe:<3}                {latency * 1000:8.2f} ms/query  recall@{K} {recall:.3f}")
+        del index
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(size) for size in sys.argv[1].split(",")) if len(sys.argv) > 1 else (100_000, 1_000_000)
+    main(sizes, int(sys.argv[2]) if len(sys.argv) > 2 else 128)
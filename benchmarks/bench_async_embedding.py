@@ -0,0 +1,71 @@
+"""Embedding throughput against the fake embedding API: sequential batches vs. the async client.
+
+Starts benchmarks/fake_embedding_server.py in-process (latency per request,
+random 429s and 429s above a concurrency cap) and embeds n distinct texts
+with embed_texts, first one batch at a time as before, then through
+async_client_func. A last run starts several callers with overlapping texts
+at once to show in-flight coalescing.
+
+Run from the repository root: python benchmarks/bench_async_embedding.py [n_texts]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# the embedding cache lives next to smartmatch.db in the working directory
+os.chdir(tempfile.mkdtemp())
+from fake_embedding_server import FakeEmbeddingServer  # noqa: E402
+
+import embedding_func  # noqa: E402
+from async_client_func import embedding_client  # noqa: E402
+
+
+def fresh_texts(run, n):
+    return [f"run {run} resume {i}: python, sql, docker" for i in range(n)]
+
+
+def main(n_texts=2000):
+    server = FakeEmbeddingServer(port=0, latency=0.2, rate_limit=0.05, max_concurrent=6).start()
+    provider = embedding_func.HttpProvider(server.url)
+    print(f"{n_texts} texts, {provider.batch_size} per request, {server.latency * 1000:.0f} ms per request, "
+          f"{server.rate_limit:.0%} random 429s, 429 above {server.max_concurrent} concurrent requests")
+
+    # before: one request after the other; a 429 fails the whole call
+    provider.remote = False
+    start = time.perf_counter()
+    try:
+        embedding_func.embed_texts(fresh_texts(0, n_texts), provider)
+        outcome = "ok"
+    except Exception as e:
+        outcome = f"failed: {e}"
+    print(f"sequential   {time.perf_counter() - start:6.2f} s  {outcome}")
+
+    provider.remote = True
+    requests_before = server.stats["requests"]
+    start = time.perf_counter()
+    embedding_func.embed_texts(fresh_texts(1, n_texts), provider)
+    print(f"async        {time.perf_counter() - start:6.2f} s  ok, {server.stats['requests'] - requests_before} requests "
+          f"(retries {embedding_client.stats['retries']}, 429s {embedding_client.stats['rate_limited']})")
+
+    # four sessions embedding the same resumes at the same time
+    texts = fresh_texts(2, n_texts // 2)
+    requests_before = server.stats["requests"]
+    callers = [threading.Thread(target=embedding_func.embed_texts, args=(texts, provider)) for _ in range(4)]
+    start = time.perf_counter()
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    print(f"4 callers    {time.perf_counter() - start:6.2f} s  {server.stats['requests'] - requests_before} requests, "
+          f"{embedding_client.stats['coalesced']} texts coalesced")
+    print(f"server: {server.stats}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,70 @@
+"""smartmatch.db size with resume text stored inline vs. in the blob store.
+
+Every student applies to 30 job descriptions. Inline, each application holds
+its own copy of the resume text; with the blob store each row holds a 64-char
+key and each distinct resume is stored once (zstd-compressed when zstandard is
+installed).
+
+Run from the repository root: python benchmarks/bench_blob_store.py [n_students]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# database_func creates smartmatch.db and blob_store_func the blobs/ directory in the working directory
+os.chdir(tempfile.mkdtemp())
+import blob_store_func  # noqa: E402
+from database_func import MIGRATIONS, _migration_blobs, migrate  # noqa: E402
+
+APPLICATIONS_PER_STUDENT = 30
+WORDS = ["python", "sql", "docker", "kubernetes", "machine", "learning", "project", "intern", "team", "data",
+         "university", "bachelor", "developed", "pipeline", "dashboard", "api", "react", "cloud"]
+
+
+def resume(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(700))
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def main(n_students=2000):
+    rng = random.Random(0)
+    conn = sqlite3.connect("bench.db")
+    migrate(conn, target_version=MIGRATIONS.index(_migration_blobs))  # schema with inline text
+    texts = [resume(rng) for _ in range(n_students)]
+    conn.executemany(
+        "INSERT INTO students (student_code, name, password, email, pdf_location) VALUES (?, 'x', 'x', ?, ?)",
+        ((f"stu_{i}", f"stu_{i}@example.com", text) for i, text in enumerate(texts)),
+    )
+    conn.executemany(
+        "INSERT INTO recruiter_resumes (recruiter_code, student_code, resume_text, jd_title) VALUES ('rec', ?, ?, ?)",
+        ((f"stu_{i}", text, f"title_{t}") for i, text in enumerate(texts) for t in range(APPLICATIONS_PER_STUDENT)),
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    inline_size = os.path.getsize("bench.db")
+
+    start = time.perf_counter()
+    migrate(conn)
+    elapsed = time.perf_counter() - start
+    conn.execute("VACUUM")
+    db_size = os.path.getsize("bench.db")
+    blob_size = directory_size(blob_store_func.BLOB_DIR)
+
+    compression = "zstd" if blob_store_func.zstandard and blob_store_func.BLOB_COMPRESSION == "zstd" else "none"
+    print(f"{n_students} students x {APPLICATIONS_PER_STUDENT} applications, blob compression: {compression}")
+    print(f"inline text:   database {inline_size / 2**20:8.1f} MiB")
+    print(f"blob store:    database {db_size / 2**20:8.1f} MiB + blobs {blob_size / 2**20:6.1f} MiB "
+          f"(migration {elapsed:.1f} s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
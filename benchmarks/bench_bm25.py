@@ -0,0 +1,100 @@
+"""BM25 over full resume texts: a per-document Python loop vs. the precomputed sparse BM25Index.
+
+Also reports the hybrid ranking cost on top of the skill-embedding cosine for
+the same applicants, i.e. what full-text signal costs without full-text embeddings.
+
+Run from the repository root: python benchmarks/bench_bm25.py [n_resumes]
+"""
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# bm25_func imports database_func, which creates smartmatch.db in the working directory
+os.chdir(tempfile.mkdtemp())
+shutil.copy(os.path.join(ROOT, "extractor_library.json"), "extractor_library.json")
+
+from bm25_func import BM25_B, BM25_K1, BM25Index  # noqa: E402
+from ranking_func import hybrid_scores, score_candidates, top_k  # noqa: E402
+from resources_func import get_skills_list  # noqa: E402
+
+FILLER = ("developed designed implemented maintained team project system service data users performance "
+          "improved reduced built scalable reliable production api backend frontend testing deployment").split()
+
+
+def make_resume(rng, skills):
+    words = rng.choices(FILLER, k=rng.randint(150, 450)) + [skill.lower() for skill in rng.sample(skills, 20)]
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def loop_bm25(texts, query, tokenize):
+    docs = [Counter(tokenize(text)) for text in texts]
+    avgdl = max(sum(sum(doc.values()) for doc in docs) / len(docs), 1.0)
+    terms = Counter(tokenize(query))
+    df = {term: sum(1 for doc in docs if term in doc) for term in terms}
+    scores = []
+    for doc in docs:
+        length, score = sum(doc.values()), 0.0
+        for term, weight in terms.items():
+            tf = doc.get(term, 0)
+            if tf:
+                idf = math.log1p((len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                score += weight * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl))
+        scores.append(score)
+    return np.array(scores)
+
+
+def main(n_resumes=20_000, repeat=20):
+    rng = random.Random(0)
+    skills = list(get_skills_list())
+    texts = [make_resume(rng, skills) for _ in range(n_resumes)]
+    jd = "We are hiring a backend engineer with " + ", ".join(rng.sample(skills, 12)) + " and production experience."
+
+    start = time.perf_counter()
+    index = BM25Index(texts)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scores = index.scores(jd)
+    indexed = (time.perf_counter() - start) / repeat
+
+    tokenize = index.vectorizer.build_analyzer()
+    start = time.perf_counter()
+    expected = loop_bm25(texts, jd, tokenize)
+    loop = time.perf_counter() - start
+    assert np.allclose(scores, expected, rtol=1e-4, atol=1e-4)
+
+    embeddings = np.random.default_rng(0).standard_normal((n_resumes, 768), dtype=np.float32)
+    query = embeddings[0]
+    overlap = np.random.default_rng(1).random(n_resumes)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        similarities = score_candidates(query, embeddings)
+        top_k(similarities)
+    embedding_only = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        similarities = score_candidates(query, embeddings)
+        top_k(hybrid_scores(index.scores(jd), similarities, overlap))
+    hybrid = (time.perf_counter() - start) / repeat
+
+    print(f"{n_resumes} resumes, {index.weights.nnz} (resume, term) weights, index built in {build:.2f} s")
+    print(f"BM25 python loop per query        {loop * 1000:9.1f} ms")
+    print(f"BM25Index per query               {indexed * 1000:9.2f} ms")
+    print(f"ranking: skill embedding only     {embedding_only * 1000:9.2f} ms")
+    print(f"ranking: hybrid BM25+cos+skills   {hybrid * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
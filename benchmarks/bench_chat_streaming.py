@@ -0,0 +1,40 @@
+"""Time-to-first-token of streamed vs. blocking chat replies.
+
+Uses the offline fake backend by default; pass "gemini" to measure the real
+model (needs GEMINI_API_KEY).
+
+Run from the repository root: python benchmarks/bench_chat_streaming.py [fake|gemini]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "")
+import google.generativeai as genai  # noqa: E402
+from llm_func import start_chat, stream_reply  # noqa: E402
+
+PROMPT = "Question: Which skills matter most for a data analyst internship?"
+
+
+def main(backend="fake", rounds=3):
+    if backend == "gemini":
+        genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+
+    for _ in range(rounds):
+        chat = start_chat(backend)
+        start = time.perf_counter()
+        chat.send_message(PROMPT)
+        blocking = time.perf_counter() - start
+
+        stats = {}
+        for _ in stream_reply(start_chat(backend), PROMPT, stats):
+            pass
+        print(
+            f"blocking: first text after {blocking:6.2f} s | "
+            f"streaming: first token after {stats['ttft']:6.2f} s, done after {stats['total']:6.2f} s ({stats['chunks']} chunks)"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "fake")
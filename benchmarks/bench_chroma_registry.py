@@ -0,0 +1,85 @@
+"""Chat panel rerun latency: a new PersistentClient + get_or_create_collection per rerun vs. the shared registry.
+
+Each "rerun" opens the recruiter chat collection the way the panel does. The
+old path builds chromadb.PersistentClient(path="chroma_db_recruiter") and
+re-fetches the collection every time; the registry (chroma_db_func.ChromaRegistry)
+opens each store once per process and hands back the cached handle. Sessions
+are simulated by threads, each rerunning for its own recruiter, which also
+checks that every thread got the same client per store. Open file
+descriptors are reported on Linux.
+
+Run from the repository root: python benchmarks/bench_chroma_registry.py [reruns] [sessions]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SMARTMATCH_EMBEDDING_BACKEND", "hashing")
+
+# database_func creates smartmatch.db and the stores are created in the working directory
+os.chdir(tempfile.mkdtemp())
+shutil.copy(os.path.join(ROOT, "extractor_library.json"), "extractor_library.json")
+import chromadb  # noqa: E402
+
+from chroma_db_func import RECRUITER_STORE, STUDENT_STORE, ChromaRegistry, GeminiEmbeddingFunction  # noqa: E402
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+
+
+def per_rerun_client(recruiter_code, embedding_function):
+    client = chromadb.PersistentClient(path=RECRUITER_STORE)
+    return client.get_or_create_collection(name=f"recruiter_{recruiter_code}", embedding_function=embedding_function)
+
+
+def run(open_collection, reruns, sessions):
+    embedding_function = GeminiEmbeddingFunction()
+
+    def session(number):
+        latencies = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            open_collection(f"rec_{number}", embedding_function)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        latencies = sorted(latency for result in pool.map(session, range(sessions)) for latency in result)
+    wall = time.perf_counter() - start
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], wall
+
+
+def main(reruns=200, sessions=8):
+    registry = ChromaRegistry()
+
+    def shared(recruiter_code, embedding_function):
+        return registry.collection(RECRUITER_STORE, f"recruiter_{recruiter_code}", embedding_function)
+
+    # create the collections up front so both paths only open existing ones
+    for number in range(sessions):
+        shared(f"rec_{number}", GeminiEmbeddingFunction())
+    registry.collection(STUDENT_STORE, "student_0_recruiter_rec_0", GeminiEmbeddingFunction())
+
+    fds = open_fds()
+    print(f"{reruns} reruns x {sessions} concurrent sessions, open fds at start: {fds}")
+    for label, open_collection in (("PersistentClient per rerun", per_rerun_client), ("ChromaRegistry", shared)):
+        median, p99, wall = run(open_collection, reruns, sessions)
+        print(f"{label:28} median {median * 1000:8.3f} ms  p99 {p99 * 1000:8.3f} ms  "
+              f"total {wall:6.2f} s  open fds {open_fds()}")
+
+    stats = registry.stats()
+    assert stats["clients"] == sorted([RECRUITER_STORE, STUDENT_STORE]), stats
+    assert registry.client(RECRUITER_STORE) is not registry.client(STUDENT_STORE)
+    print(f"registry: {len(stats['clients'])} clients ({', '.join(stats['clients'])}), {stats['collections']} collection handles")
+    registry.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 8)
@@ -0,0 +1,60 @@
+"""Throughput and latency of the embedding backends in embedding_func.
+
+Backends that cannot be created here (no GEMINI_API_KEY, sentence-transformers
+not installed) are skipped. The embedding cache is bypassed so every text is
+really embedded.
+
+Run from the repository root: python benchmarks/bench_embedding_backends.py [n_texts]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# embedding_func creates embedding_cache.db in the working directory on import
+os.chdir(tempfile.mkdtemp())
+from embedding_func import GeminiProvider, HashingProvider, SentenceTransformerProvider  # noqa: E402
+
+
+def skill_strings(n, seed=0):
+    with open(os.path.join(ROOT, "extractor_library.json")) as file:
+        skills = json.load(file)["skills_list"]
+    rng = random.Random(seed)
+    return [", ".join(rng.sample(skills, rng.randint(3, 25))) for _ in range(n)]
+
+
+def create(factory):
+    try:
+        return factory()
+    except (ImportError, KeyError, OSError) as e:
+        print(f"skipping {factory.__name__}: {e!r}")
+        return None
+
+
+def main(n_texts=2000):
+    texts = skill_strings(n_texts)
+    print(f"{'backend':<42}{'dim':>6}{'texts/s':>10}{'p50 batch ms':>14}{'p95 batch ms':>14}")
+    for factory in (HashingProvider, SentenceTransformerProvider, GeminiProvider):
+        provider = create(factory)
+        if provider is None:
+            continue
+        sample = texts if not isinstance(provider, GeminiProvider) else texts[:500]
+        latencies, dim = [], 0
+        start = time.perf_counter()
+        for i in range(0, len(sample), provider.batch_size):
+            batch_start = time.perf_counter()
+            dim = provider.embed(sample[i:i + provider.batch_size]).shape[1]
+            latencies.append((time.perf_counter() - batch_start) * 1000)
+        elapsed = time.perf_counter() - start
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{provider.name:<42}{dim:>6}{len(sample) / elapsed:>10.0f}{statistics.median(latencies):>14.1f}{p95:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
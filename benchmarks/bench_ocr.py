@@ -0,0 +1,64 @@
+"""OCR throughput of pdf_func.extract_pdf_text on a multi-page scanned PDF.
+
+Builds a fixture whose pages are images only (no text layer), then extracts it
+serially, with the OCR thread pool, and again from the OCR page cache. Needs
+pytesseract and the tesseract binary.
+
+Run from the repository root: python benchmarks/bench_ocr.py [pages]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+with open(os.path.join(ROOT, "resume_parser.ipynb")) as file:
+    SAMPLE = file.read()[2000:6000].replace("\\n", "\n")
+
+# database_func creates smartmatch.db (holding the OCR cache) in the working directory on import
+os.chdir(tempfile.mkdtemp())
+import fitz  # noqa: E402
+import pdf_func  # noqa: E402
+
+
+def scanned_fixture(pages):
+    text_doc = fitz.open()
+    scanned = fitz.open()
+    for n in range(pages):
+        page = text_doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"Page {n + 1}\n{SAMPLE}", fontsize=10)
+        pixmap = page.get_pixmap(dpi=200)
+        scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pixmap)
+    return scanned.tobytes()
+
+
+def run(label, pdf_bytes, workers):
+    pdf_func._reset_ocr_pool()
+    pdf_func.OCR_WORKERS = workers
+    stats = []
+    start = time.perf_counter()
+    text = pdf_func.extract_pdf_text(pdf_bytes, stats=stats)
+    elapsed = time.perf_counter() - start
+    per_page = [entry["seconds"] for entry in stats]
+    methods = sorted({entry["method"] for entry in stats})
+    print(
+        f"{label:<22}{len(stats) / elapsed:>9.2f} pages/s  total {elapsed:6.2f} s  "
+        f"slowest page {max(per_page):5.2f} s  {len(text):>7} chars  {', '.join(methods)}"
+    )
+
+
+def main(pages=12):
+    if shutil.which("tesseract") is None:
+        sys.exit("tesseract is not installed; nothing to benchmark")
+    pdf_bytes = scanned_fixture(pages)
+    print(f"{pages} scanned pages at {pdf_func.OCR_DPI} dpi")
+    run("serial (1 worker)", pdf_bytes, 1)
+    pdf_func.connect_db().execute("DELETE FROM ocr_cache").connection.commit()
+    run(f"pool ({os.cpu_count()} threads)", pdf_bytes, os.cpu_count())
+    run("page cache", pdf_bytes, os.cpu_count())
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 12)
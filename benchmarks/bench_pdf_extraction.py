@@ -0,0 +1,86 @@
+"""Time and memory of PDF text extraction on a 200-page PDF.
+
+Compares the old approach (read the whole file, then `text += page.get_text()`)
+with pdf_func.extract_pdf_text on bytes, on a memory-mapped path and on a plain
+path, and with the hash check that skips extraction for an unchanged file. Each
+variant runs in a fresh process so peak RSS is not shared between them.
+
+Run from the repository root: python benchmarks/bench_pdf_extraction.py [pages]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+VARIANTS = ["read + concatenate", "bytes + join", "path + mmap", "path", "hash only (unchanged)"]
+
+
+def build_fixture(path, pages):
+    import fitz
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    words = ["python", "sql", "docker", "kubernetes", "machine", "learning", "project", "intern", "team", "data"]
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        text = " ".join(rng.choice(words, 600))
+        page.insert_textbox(fitz.Rect(40, 40, 560, 500), f"Page {n + 1}\n{text}", fontsize=7)
+        # an incompressible logo-sized image per page, so the file is as heavy as a real exported resume
+        noise = rng.integers(0, 256, (160, 160, 3), dtype=np.uint8)
+        pixmap = fitz.Pixmap(fitz.csRGB, 160, 160, noise.tobytes(), False)
+        page.insert_image(fitz.Rect(40, 520, 200, 680), pixmap=pixmap)
+    doc.save(path)
+
+
+def run_variant(variant, path):
+    # database_func creates smartmatch.db in the working directory on import
+    os.chdir(os.path.dirname(path))
+    import fitz
+    import pdf_func
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    if variant == "read + concatenate":
+        with open(path, "rb") as file:
+            pdf_bytes = file.read()
+        text = ""
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            for page in doc:
+                text += page.get_text()
+    elif variant == "bytes + join":
+        with open(path, "rb") as file:
+            text = pdf_func.extract_pdf_text(file.read(), ocr=False)
+    elif variant == "path + mmap":
+        text = pdf_func.extract_pdf_text(path, ocr=False, use_mmap=True)
+    elif variant == "path":
+        text = pdf_func.extract_pdf_text(path, ocr=False)
+    else:
+        text = pdf_func.file_hash(path)
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    print(f"{variant:<24}{elapsed * 1000:>9.1f} ms  python peak {python_peak / 2**20:7.1f} MiB  "
+          f"RSS growth {rss_growth / 1024:7.1f} MiB  {len(text):>9} chars")
+
+
+def main(pages=200):
+    path = os.path.join(tempfile.mkdtemp(), "resume.pdf")
+    build_fixture(path, pages)
+    print(f"{pages} pages, {os.path.getsize(path) / 2**20:.1f} MiB on disk")
+    for variant in VARIANTS:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--variant", variant, path], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--variant":
+        run_variant(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
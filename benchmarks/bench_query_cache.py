@@ -0,0 +1,72 @@
+"""Recruiter dashboard queries per rerun, with and without the query cache.
+
+One rerun of the recruiter dashboard runs the JD list, the selected JD's skills,
+the applicants join, the shortlist features and the recruiter's email. The
+benchmark times those calls uncached and cached, for a JD with n applicants.
+
+Run from the repository root: python benchmarks/bench_query_cache.py [n_applicants]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SMARTMATCH_EMBEDDING_BACKEND", "hashing")
+
+# database_func creates smartmatch.db in the working directory on import
+os.chdir(tempfile.mkdtemp())
+shutil.copy(os.path.join(ROOT, "extractor_library.json"), "extractor_library.json")
+import database_func as db  # noqa: E402
+from query_cache_func import query_cache  # noqa: E402
+from resources_func import get_skills_list  # noqa: E402
+from shortlist_func import fetch_shortlist_page  # noqa: E402
+
+QUERIES = [
+    (db.get_job_descriptions, lambda skills: ("rec",)),
+    (db.get_job_skills, lambda skills: ("rec", "title_0")),
+    (db.fetch_applicants, lambda skills: ("rec", "title_0")),
+    (fetch_shortlist_page, lambda skills: ("rec", "title_0", skills, 12)),
+    (db.fetch_job_features, lambda skills: ("rec", skills, "title_0")),
+    (db.get_recruiter_email, lambda skills: ("rec",)),
+]
+
+
+def populate(n_applicants, skills):
+    conn = db.connect_db()
+    conn.execute("INSERT INTO recruiters (recruiter_code, password, email) VALUES ('rec', 'x', 'rec@example.com')")
+    conn.executemany(
+        "INSERT INTO students (student_code, name, password, email) VALUES (?, ?, 'x', ?)",
+        ((f"stu_{i}", f"Student {i}", f"stu_{i}@example.com") for i in range(n_applicants)),
+    )
+    conn.commit()
+    conn.close()
+    for t in range(10):
+        db.save_job_description("rec", f"title_{t}", " ".join(skills[t * 7:t * 7 + 12]), None, skills)
+    for i in range(n_applicants):
+        db.save_student_resume(f"stu_{i}", " ".join(skills[i % 400:i % 400 + 15]), skills)
+        db.submit_application("rec", f"stu_{i}", "title_0")
+
+
+def rerun(skills, cached):
+    for query, args in QUERIES:
+        (query if cached else query.uncached)(*args(skills))
+
+
+def main(n_applicants=1000, repeat=50):
+    skills = get_skills_list()
+    populate(n_applicants, skills)
+    for cached in (False, True):
+        rerun(skills, cached)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            rerun(skills, cached)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"{'cached' if cached else 'uncached':<10}{elapsed:>9.2f} ms per rerun")
+    print(f"cache: {query_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,82 @@
+"""Per-rerun setup cost of home.py before and after the resources_func layer.
+
+Streamlit executes home.py from the top on every interaction. Before, each rerun
+re-read and parsed extractor_library.json, re-ran genai.configure and looked the
+skill matcher up by hashing the whole skills list; a new process also took the
+database write lock to check the schema. Now those come from per-process caches
+that only check the library file's mtime.
+
+Run from the repository root: python benchmarks/bench_rerun.py [reruns]
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+# database_func creates smartmatch.db in the working directory on import
+os.chdir(tempfile.mkdtemp())
+shutil.copy(os.path.join(ROOT, "extractor_library.json"), "extractor_library.json")
+import google.generativeai as genai  # noqa: E402
+
+import database_func  # noqa: E402
+import resources_func  # noqa: E402
+from extractor_func import get_matcher  # noqa: E402
+from profile_func import get_scanner  # noqa: E402
+
+
+def rerun_before():
+    with open("extractor_library.json", "r") as file:
+        skills_list = json.load(file)["skills_list"]
+    genai.configure(api_key=os.environ['GEMINI_API_KEY'])
+    return get_matcher(skills_list)
+
+
+def rerun_after():
+    skills_list = resources_func.get_skills_list()
+    resources_func.configure_genai()
+    return get_scanner(skills_list)
+
+
+def schema_check_before():
+    # the old migrate(): BEGIN IMMEDIATE before even looking at user_version
+    conn = sqlite3.connect(database_func.DB_PATH)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("PRAGMA user_version").fetchone()
+    conn.rollback()
+    conn.close()
+
+
+def schema_check_after():
+    database_func._schema_ready.clear()
+    database_func.create_tables()
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(repeat=2000):
+    print(f"{'per rerun':<28}{'before (us)':>12}{'after (us)':>12}")
+    print(f"{'library + genai + matcher':<28}{timed(rerun_before, repeat):>12.1f}{timed(rerun_after, repeat):>12.1f}")
+    print(f"{'schema check (new process)':<28}{timed(schema_check_before, repeat):>12.1f}"
+          f"{timed(schema_check_after, repeat):>12.1f}")
+
+    os.utime("extractor_library.json")
+    start = time.perf_counter()
+    get_scanner(resources_func.get_skills_list())
+    print(f"reload after the library file changed: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
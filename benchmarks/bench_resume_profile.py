@@ -0,0 +1,72 @@
+"""Profile extraction per resume: per-keyword regex loops (as in resume_parser.ipynb) vs. one ResumeScanner pass.
+
+The baseline runs one regex per skill, one per education keyword, the section
+heading regex and an experience regex; the scanner gets skills, education,
+degree level, sections and stated experience out of a single trie walk.
+
+Run from the repository root: python benchmarks/bench_resume_profile.py [n_resumes]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from profile_func import get_scanner  # noqa: E402
+from resources_func import get_education_keywords, get_skills_list  # noqa: E402
+from retrieval_func import SECTION_HEADING  # noqa: E402
+
+EXPERIENCE = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?experience", re.IGNORECASE)
+
+
+def make_resume(rng, skills_list, education_keywords):
+    skills = rng.sample(skills_list, 15)
+    return "\n".join([
+        "Summary",
+        f"Engineer with {rng.randint(1, 9)} years of experience in {', '.join(skills[:3])}.",
+        "Education",
+        f"{rng.choice(education_keywords)} in {rng.choice(education_keywords)}, 2018 - 2022",
+        "Work Experience",
+        *(f"Built services with {skill} and improved reliability for a large user base." for skill in skills[3:10]),
+        "Projects",
+        *(f"Side project using {skill}." for skill in skills[10:]),
+        "Skills",
+        ", ".join(skills),
+    ])
+
+
+def regex_profile(text, skills_list, education_keywords):
+    skills = [s for s in skills_list if re.search(r"\b" + re.escape(s) + r"\b", text, re.IGNORECASE)]
+    education = [e for e in education_keywords if re.search(r"\b" + re.escape(e) + r"\b", text, re.IGNORECASE)]
+    sections = [m.start() for m in SECTION_HEADING.finditer(text)]
+    years = [float(m.group(1)) for m in EXPERIENCE.finditer(text)]
+    return skills, education, sections, max(years) if years else None
+
+
+def main(n_resumes=300):
+    skills_list, education_keywords = get_skills_list(), get_education_keywords()
+    rng = random.Random(0)
+    resumes = [make_resume(rng, list(skills_list), list(education_keywords)) for _ in range(n_resumes)]
+    scanner = get_scanner(skills_list, education_keywords)
+
+    start = time.perf_counter()
+    baseline = [regex_profile(text, skills_list, education_keywords) for text in resumes]
+    loop = (time.perf_counter() - start) / n_resumes
+
+    start = time.perf_counter()
+    profiles = [scanner.scan(text) for text in resumes]
+    scan = (time.perf_counter() - start) / n_resumes
+
+    for (skills, education, _, years), profile in zip(baseline, profiles):
+        assert skills == profile["skills"] and years == profile["experience_years"]
+    print(f"{n_resumes} resumes, {len(skills_list)} skills, {len(education_keywords)} education keywords")
+    print(f"regex loops per keyword   {loop * 1000:8.2f} ms / resume")
+    print(f"single ResumeScanner pass {scan * 1000:8.2f} ms / resume  ({loop / scan:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
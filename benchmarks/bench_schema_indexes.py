@@ -0,0 +1,104 @@
+"""Hot smartmatch.db queries on 1M applications, before and after the index migration.
+
+Run from the repository root: python benchmarks/bench_schema_indexes.py [n_applications]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# database_func creates smartmatch.db in the working directory on import
+os.chdir(tempfile.mkdtemp())
+from database_func import MIGRATIONS, _migration_indexes, migrate  # noqa: E402
+
+N_RECRUITERS = 200
+N_TITLES = 25
+N_STUDENTS = 50_000
+
+QUERIES = {
+    "applicants of a JD": (
+        """
+        SELECT s.student_code, s.name, rr.resume_text
+        FROM recruiter_resumes rr
+        JOIN students s ON rr.student_code = s.student_code
+        WHERE rr.jd_title = ? AND rr.recruiter_code = ?
+        """,
+        lambda rng: (f"title_{rng.randrange(N_TITLES)}", f"rec_{rng.randrange(N_RECRUITERS)}"),
+    ),
+    "already applied?": (
+        "SELECT COUNT(*) FROM recruiter_resumes WHERE recruiter_code = ? AND student_code = ? AND jd_title = ?",
+        lambda rng: (f"rec_{rng.randrange(N_RECRUITERS)}", f"stu_{rng.randrange(N_STUDENTS)}", f"title_{rng.randrange(N_TITLES)}"),
+    ),
+    "JDs of a recruiter": (
+        """
+        SELECT jd.title, jd.description, jd.skills
+        FROM job_descriptions jd
+        JOIN recruiters r ON jd.recruiter_id = r.recruiter_id
+        WHERE r.recruiter_code = ?
+        """,
+        lambda rng: (f"rec_{rng.randrange(N_RECRUITERS)}",),
+    ),
+}
+
+
+def populate(conn, n_applications):
+    rng = random.Random(0)
+    conn.executemany(
+        "INSERT INTO recruiters (recruiter_code, password, email) VALUES (?, 'x', ?)",
+        ((f"rec_{i}", f"rec_{i}@example.com") for i in range(N_RECRUITERS)),
+    )
+    conn.executemany(
+        "INSERT INTO job_descriptions (recruiter_id, title, description, skills) VALUES (?, ?, 'description', 'Python, SQL')",
+        ((r + 1, f"title_{t}") for r in range(N_RECRUITERS) for t in range(N_TITLES)),
+    )
+    conn.executemany(
+        "INSERT INTO students (student_code, name, password, email) VALUES (?, ?, 'x', ?)",
+        ((f"stu_{i}", f"Student {i}", f"stu_{i}@example.com") for i in range(N_STUDENTS)),
+    )
+    seen = set()
+    while len(seen) < n_applications:
+        seen.add((rng.randrange(N_RECRUITERS), rng.randrange(N_STUDENTS), rng.randrange(N_TITLES)))
+    conn.executemany(
+        "INSERT INTO recruiter_resumes (recruiter_code, student_code, resume_text, jd_title) VALUES (?, ?, 'resume', ?)",
+        ((f"rec_{r}", f"stu_{s}", f"title_{t}") for r, s, t in seen),
+    )
+    conn.commit()
+
+
+def time_queries(conn, repeat=50):
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params(rng)).fetchall()
+        results[name] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+
+def main(n_applications=1_000_000):
+    conn = sqlite3.connect(os.path.join(os.getcwd(), "bench.db"))
+    migrate(conn, target_version=MIGRATIONS.index(_migration_indexes))  # schema as it was before the indexes
+
+    start = time.perf_counter()
+    populate(conn, n_applications)
+    print(f"populated {n_applications} applications in {time.perf_counter() - start:.1f} s")
+
+    before = time_queries(conn, repeat=5)
+    start = time.perf_counter()
+    migrate(conn, target_version=MIGRATIONS.index(_migration_indexes) + 1)
+    print(f"index migration took {time.perf_counter() - start:.1f} s")
+    after = time_queries(conn)
+
+    print(f"{'query':<22}{'no indexes (ms)':>18}{'indexed (ms)':>15}")
+    for name in QUERIES:
+        print(f"{name:<22}{before[name]:>18.3f}{after[name]:>15.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,118 @@
+"""Shortlist rerun cost for a JD with n applicants: scoring and rendering everyone vs. one SQL page.
+
+"all rows" is the previous shortlist: load every application's features, score
+all of them, build one table row and one contact row per applicant. "page" is
+shortlist_func.fetch_shortlist_page: the first call scores lazily (only the
+page and the prefetch window when sorted by name, everyone once when sorted by
+score), later pages and reruns read stored scores through SQL.
+
+Run from the repository root: python benchmarks/bench_shortlist.py [n_applicants]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SMARTMATCH_EMBEDDING_BACKEND", "hashing")
+
+# database_func creates smartmatch.db in the working directory on import
+os.chdir(tempfile.mkdtemp())
+shutil.copy(os.path.join(ROOT, "extractor_library.json"), "extractor_library.json")
+import numpy as np  # noqa: E402
+
+import database_func as db  # noqa: E402
+from ranking_func import rank_candidates  # noqa: E402
+from resources_func import get_skills_list  # noqa: E402
+from shortlist_func import SHORTLIST_PAGE_SIZE, fetch_shortlist_page  # noqa: E402
+
+
+def populate(n_applicants, skills):
+    conn = db.connect_db()
+    conn.execute("INSERT INTO recruiters (recruiter_code, password, email) VALUES ('rec', 'x', 'rec@example.com')")
+    conn.executemany(
+        "INSERT INTO students (student_code, name, password, email) VALUES (?, ?, 'x', ?)",
+        ((f"stu_{i}", f"Student {i}", f"stu_{i}@example.com") for i in range(n_applicants)),
+    )
+    conn.commit()
+    conn.close()
+    db.save_job_description("rec", "title_0", " ".join(skills[:12]), None, skills)
+    for i in range(n_applicants):
+        db.save_student_resume(f"stu_{i}", " ".join(skills[i % 400:i % 400 + 15]), skills)
+        db.submit_application("rec", f"stu_{i}", "title_0")
+
+
+def fetch_application_features():
+    # the query the unpaginated shortlist ran: every applicant with their stored skills and embedding
+    conn = db.connect_db()
+    rows = conn.execute(
+        """
+        SELECT s.student_code, s.name, rr.extracted_resume_skills, rr.resume_embedding
+        FROM recruiter_resumes rr JOIN students s ON rr.student_code = s.student_code
+        WHERE rr.recruiter_code = 'rec' AND rr.jd_title = 'title_0'
+        """
+    ).fetchall()
+    conn.close()
+    return [
+        {"student_code": row[0], "name": row[1], "skills": db.split_skills(row[2]), "embedding": db.blob_to_embedding(row[3])}
+        for row in rows
+    ]
+
+
+def all_rows(skills):
+    applications = fetch_application_features()
+    jd = db.fetch_job_features.uncached("rec", skills, title="title_0")[0]
+    ranked, scores = rank_candidates(jd["embedding"], np.vstack([a["embedding"] for a in applications]))
+    jd_skills = set(jd["skills"])
+    table = [
+        {"Student ID": applications[i]["student_code"], "Name": applications[i]["name"], "Resume Score": float(score),
+         "Matching Skills": ", ".join(jd_skills.intersection(applications[i]["skills"]))}
+        for i, score in zip(ranked, scores)
+    ]
+    # one contact row (st.checkbox) per applicant
+    contacts = [{"Student ID": c[0], "Name": c[1], "Email": c[2], "Select": False} for c in db.fetch_applicants.uncached("rec", "title_0")]
+    assert len(contacts) == len(table)
+    return table
+
+
+def page(skills, number, sort):
+    return fetch_shortlist_page.uncached("rec", "title_0", skills, 12, number, SHORTLIST_PAGE_SIZE, sort)
+
+
+def timed(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def clear_scores():
+    conn = db.connect_db()
+    conn.execute("UPDATE recruiter_resumes SET resume_score = NULL, skill_overlap = NULL, scores_key = NULL")
+    conn.commit()
+    conn.close()
+
+
+def main(n_applicants=5000):
+    skills = get_skills_list()
+    populate(n_applicants, skills)
+    print(f"{n_applicants} applicants, {SHORTLIST_PAGE_SIZE} per page")
+
+    results = [("all rows (score + render everyone)", *timed(all_rows, skills))]
+    clear_scores()
+    results.append(("page 1 by name, cold (lazy window)", *timed(page, skills, 0, "Name")))
+    results.append(("page 2 by name (prefetched)", *timed(page, skills, 1, "Name")))
+    results.append(("page 1 by score, cold (scores all once)", *timed(page, skills, 0, "Resume Score")))
+    results.append(("page 40 by score, warm", *timed(page, skills, 39, "Resume Score")))
+    for label, elapsed, peak in results:
+        print(f"{label:42} {elapsed * 1000:9.1f} ms  peak {peak / 2 ** 20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
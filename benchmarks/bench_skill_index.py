@@ -0,0 +1,58 @@
+"""Skill overlap of one JD with every application: per-row set intersections vs. the inverted SkillIndex.
+
+Run from the repository root: python benchmarks/bench_skill_index.py [n_applications]
+"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# skill_index_func imports database_func, which creates smartmatch.db in the working directory
+os.chdir(tempfile.mkdtemp())
+shutil.copy(os.path.join(ROOT, "extractor_library.json"), "extractor_library.json")
+
+from skill_index_func import SkillIndex  # noqa: E402
+
+
+def main(n_applications=100_000, repeat=20):
+    with open("extractor_library.json", "r") as file:
+        skills_list = json.load(file)["skills_list"]
+    rng = random.Random(0)
+    # popular skills are much more common than niche ones, as in real resumes
+    weights = [1 / (rank + 1) for rank in range(len(skills_list))]
+    applications = [sorted(set(rng.choices(skills_list, weights, k=rng.randint(5, 25)))) for _ in range(n_applications)]
+    jd_skills = rng.sample(skills_list[:60], 12)
+    min_skills = 4
+
+    start = time.perf_counter()
+    index = SkillIndex(applications, skills_list)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        jd_set = set(jd_skills)
+        counts_loop = [len(jd_set.intersection(skills)) for skills in applications]
+        eligible_loop = [i for i, count in enumerate(counts_loop) if count >= min_skills]
+    loop = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        counts = index.overlap_counts(jd_skills)
+        eligible = index.at_least(jd_skills, min_skills, counts)
+    indexed = (time.perf_counter() - start) / repeat
+
+    assert counts.tolist() == counts_loop and eligible.tolist() == eligible_loop
+    postings = sum(len(posting) for posting in index.postings)
+    print(f"{n_applications} applications, {postings} postings, index built in {build * 1000:.0f} ms")
+    print(f"set intersection per application  {loop * 1000:9.2f} ms")
+    print(f"inverted index (counts + >= {min_skills})   {indexed * 1000:9.2f} ms  ({len(eligible)} eligible)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
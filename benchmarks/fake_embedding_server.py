@@ -0,0 +1,96 @@
+"""Local stand-in for a remote embedding API, for exercising async_client_func.
+
+Speaks the protocol of embedding_func.HttpProvider (POST {"texts": [...]} ->
+{"embeddings": [...]}), sleeps `latency` seconds per request and answers 429
+with a Retry-After header when more than `max_concurrent` requests are in
+flight or, at random, for a `rate_limit` fraction of requests.
+
+Point the app at it with SMARTMATCH_EMBEDDING_BACKEND=http and
+SMARTMATCH_EMBEDDING_URL=http://127.0.0.1:8765/embed, or start it from
+another script with FakeEmbeddingServer(...).start().
+
+Run: python benchmarks/fake_embedding_server.py [--port 8765] [--latency 0.2] [--rate-limit 0.05]
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DIM = 64
+
+
+def fake_embedding(text):
+    digest = hashlib.sha256(text.encode("utf-8")).digest() * (DIM // 32)
+    return [byte / 255 - 0.5 for byte in digest[:DIM]]
+
+
+class FakeEmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=8765, latency=0.2, rate_limit=0.0, max_concurrent=16, retry_after=0.2, seed=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {"requests": 0, "texts": 0, "rate_limited": 0, "max_in_flight": 0}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/embed"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        texts = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["texts"]
+        with server.lock:
+            server.stats["requests"] += 1
+            server.in_flight += 1
+            server.stats["max_in_flight"] = max(server.stats["max_in_flight"], server.in_flight)
+            limited = server.in_flight > server.max_concurrent or server.random.random() < server.rate_limit
+        try:
+            if limited:
+                with server.lock:
+                    server.stats["rate_limited"] += 1
+                self.send_response(429)
+                self.send_header("Retry-After", str(server.retry_after))
+                self.end_headers()
+                return
+            time.sleep(server.latency)
+            body = json.dumps({"embeddings": [fake_embedding(text) for text in texts]}).encode("utf-8")
+            with server.lock:
+                server.stats["texts"] += len(texts)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake embedding API with latency and 429s.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rate-limit", type=float, default=0.05)
+    parser.add_argument("--max-concurrent", type=int, default=16)
+    args = parser.parse_args()
+    server = FakeEmbeddingServer(args.port, args.latency, args.rate_limit, args.max_concurrent)
+    print(f"fake embedding API on {server.url}")
+    server.serve_forever()
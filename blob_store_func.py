@@ -0,0 +1,81 @@
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+
+try:
+    import zstandard
+except ImportError:  # optional: without it blobs are stored uncompressed
+    zstandard = None
+
+
+BLOB_DIR = os.path.join(os.path.dirname(os.path.abspath("smartmatch.db")), "blobs")
+# "zstd" (default, when the zstandard package is installed) or "none"
+BLOB_COMPRESSION = os.environ.get("SMARTMATCH_BLOB_COMPRESSION", "zstd")
+ZSTD_LEVEL = 3
+TEXT_CACHE_SIZE = 256  # decoded texts kept in memory by get_text
+
+
+def blob_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _blob_path(key, compressed):
+    # two-level fan-out keeps directories small: blobs/ab/abcdef....zst
+    return os.path.join(BLOB_DIR, key[:2], key + (".zst" if compressed else ""))
+
+
+def has_blob(key):
+    return os.path.exists(_blob_path(key, True)) or os.path.exists(_blob_path(key, False))
+
+
+def put_blob(data):
+    """Store bytes (or a str, as UTF-8) under their SHA-256 and return it; storing the same content twice is free."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    data = bytes(data)
+    key = blob_hash(data)
+    if has_blob(key):
+        return key
+
+    compressed = BLOB_COMPRESSION == "zstd" and zstandard is not None
+    path = _blob_path(key, compressed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data) if compressed else data
+    # write to a temporary file and rename, so readers never see a partial blob
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return key
+
+
+def get_blob(key):
+    """Contents of a blob; raises KeyError if there is none with that key."""
+    path = _blob_path(key, True)
+    if os.path.exists(path):
+        if zstandard is None:
+            raise RuntimeError(f"blob {key} is zstd-compressed; install zstandard to read it")
+        with open(path, "rb") as file:
+            return zstandard.ZstdDecompressor().decompress(file.read())
+    try:
+        with open(_blob_path(key, False), "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        raise KeyError(key) from None
+
+
+def put_text(text):
+    return put_blob(text or "")
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def get_text(key):
+    """Text stored with put_text; None for a None key. Blobs never change, so the decoded text is cached."""
+    if key is None:
+        return None
+    return get_blob(key).decode("utf-8")
@@ -0,0 +1,85 @@
+import hashlib
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from blob_store_func import get_text
+from database_func import connect_db, get_job_descriptions
+
+
+BM25_K1 = 1.5   # term frequency saturation
+BM25_B = 0.75   # document length normalization
+# words, keeping technology names such as c++, c#, node.js and asp.net together
+TOKEN_PATTERN = r"(?u)\b\w[\w+#]*(?:\.\w+)*[+#]*"
+
+
+class BM25Index:
+    """Okapi BM25 over full resume texts, computed locally.
+
+    The per-(document, term) BM25 weights are precomputed into a sparse matrix,
+    so scoring a query against every document is one sparse column slice and
+    matrix-vector product.
+    """
+
+    def __init__(self, texts, k1=BM25_K1, b=BM25_B):
+        self.vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, dtype=np.float32)
+        n = len(texts)
+        try:
+            tf = self.vectorizer.fit_transform(texts).tocsr()
+        except ValueError:
+            # no document has a single token
+            self.vectorizer, self.weights, self.size = None, None, n
+            return
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        df = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+        tf.data = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + norm[rows])
+        self.weights = tf.tocsc()
+        self.size = n
+
+    def scores(self, query):
+        """BM25 score of every document for the query text."""
+        if self.vectorizer is None:
+            return np.zeros(self.size, dtype=np.float32)
+        counts = self.vectorizer.transform([query])
+        if counts.nnz == 0:
+            return np.zeros(self.size, dtype=np.float32)
+        return np.asarray(self.weights[:, counts.indices] @ counts.data, dtype=np.float32).ravel()
+
+
+def precompute_bm25_scores(recruiter_code, jd_title):
+    """Store the BM25 score of the job description's text for each of its applications; returns the best score.
+
+    The index over the applicants' resumes is only rebuilt when the applications or the
+    description changed since the stored scores (bm25_key).
+    """
+    description = get_job_descriptions(recruiter_code).get(jd_title, "")
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute(
+        """
+        SELECT COUNT(*) || ':' || IFNULL(MAX(id), 0) || ':' || IFNULL(MAX(timestamp), '')
+        FROM recruiter_resumes WHERE recruiter_code = ? AND jd_title = ?
+        """,
+        (recruiter_code, jd_title),
+    )
+    key = hashlib.sha256(f"{c.fetchone()[0]}|{description}".encode("utf-8")).hexdigest()[:16]
+    c.execute(
+        "SELECT COUNT(*) FROM recruiter_resumes WHERE recruiter_code = ? AND jd_title = ? AND bm25_key IS NOT ?",
+        (recruiter_code, jd_title, key),
+    )
+    if c.fetchone()[0]:
+        c.execute("SELECT id, resume_blob FROM recruiter_resumes WHERE recruiter_code = ? AND jd_title = ?", (recruiter_code, jd_title))
+        rows = c.fetchall()
+        scores = BM25Index([get_text(blob) for _, blob in rows]).scores(description)
+        c.executemany(
+            "UPDATE recruiter_resumes SET bm25_score = ?, bm25_key = ? WHERE id = ?",
+            [(float(score), key, application_id) for (application_id, _), score in zip(rows, scores)],
+        )
+        conn.commit()
+    c.execute("SELECT IFNULL(MAX(bm25_score), 0) FROM recruiter_resumes WHERE recruiter_code = ? AND jd_title = ?", (recruiter_code, jd_title))
+    best = c.fetchone()[0]
+    conn.close()
+    return best
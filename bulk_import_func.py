@@ -0,0 +1,261 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+import zipfile
+
+from database_func import (
+    FEATURES_VERSION,
+    compute_resume_features,
+    connect_db,
+    embedding_to_blob,
+    get_job_descriptions,
+    get_provider,
+    recruiter_exists,
+)
+from profile_func import profile_columns
+from pdf_func import extract_pdf_text, file_hash
+from blob_store_func import put_text
+from query_cache_func import query_cache
+from resources_func import get_skills_list
+
+
+IMPORT_WORKERS = int(os.environ.get("SMARTMATCH_IMPORT_WORKERS", str(os.cpu_count() or 2)))
+IMPORT_BATCH_SIZE = 500  # documents per features batch and per write transaction
+
+_archives = {}
+
+
+def list_pdfs(path):
+    """PDF members of a directory (paths relative to it) or of a zip archive, in a stable order."""
+    if os.path.isdir(path):
+        members = []
+        for root, _, files in os.walk(path):
+            for name in files:
+                if name.lower().endswith(".pdf"):
+                    members.append(os.path.relpath(os.path.join(root, name), path))
+        return sorted(members)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return sorted(name for name in archive.namelist() if name.lower().endswith(".pdf"))
+    raise ValueError(f"{path} is neither a directory nor a zip archive")
+
+
+def student_code_for(member):
+    # resumes are named after the student, e.g. 21CS1001.pdf
+    return os.path.splitext(os.path.basename(member))[0]
+
+
+def _read_member(path, member):
+    if os.path.isdir(path):
+        # a file on disk is hashed and parsed in place rather than read into memory
+        return os.path.join(path, member)
+    # one open archive per worker process instead of one per file
+    if path not in _archives:
+        _archives[path] = zipfile.ZipFile(path)
+    return _archives[path].read(member)
+
+
+def _extract(item):
+    """Runs in the extraction pool: (path, member, stored hash) -> (member, text, error, hash).
+
+    text and error are both None when the file is the one the student's resume was already extracted from.
+    """
+    path, member, stored_hash = item
+    try:
+        source = _read_member(path, member)
+        digest = file_hash(source)
+        if digest == stored_hash:
+            return member, None, None, digest
+        text = extract_pdf_text(source)
+    except Exception as e:
+        return member, None, f"{type(e).__name__}: {e}", None
+    if not text.strip():
+        return member, None, "empty or unreadable PDF", digest
+    return member, text, None, digest
+
+
+def load_manifest(manifest_path):
+    """student_code -> (name, email, password) for students to create if they have no account yet."""
+    with open(manifest_path, newline="") as file:
+        return {
+            row["student_code"]: (row["name"], row["email"], row["password"])
+            for row in csv.DictReader(file)
+        }
+
+
+def _write_batch(conn, source, batch, skills_list, known_students, manifest, recruiter_code, jd_title):
+    """Store one batch of extracted resumes and its checkpoints in a single transaction; returns per-state counts."""
+    checkpoints, docs, new_students, unchanged = [], [], [], []
+    for member, text, error, digest in batch:
+        code = student_code_for(member)
+        if error:
+            checkpoints.append((source, member, code, "failed", error))
+        elif text is None:
+            unchanged.append((member, code))
+        elif code not in known_students and code not in manifest:
+            checkpoints.append((source, member, code, "skipped", "no student account and not in the manifest"))
+        else:
+            if code not in known_students:
+                new_students.append((code, *manifest[code]))
+            known_students[code] = digest
+            docs.append((member, code, text, digest))
+
+    model = get_provider().name
+    profiles, embeddings = compute_resume_features([doc[2] for doc in docs], skills_list) if docs else ([], [])
+
+    c = conn.cursor()
+    c.executemany(
+        "INSERT OR IGNORE INTO students (student_code, name, email, password) VALUES (?, ?, ?, ?)",
+        new_students,
+    )
+    if new_students:
+        # INSERT OR IGNORE drops a manifest row whose email another student already has
+        codes = [student[0] for student in new_students]
+        c.execute(f"SELECT student_code FROM students WHERE student_code IN ({', '.join('?' * len(codes))})", codes)
+        missing = set(codes).difference(row[0] for row in c.fetchall())
+        for member, code, _, _ in docs:
+            if code in missing:
+                checkpoints.append((source, member, code, "failed", "could not create the student account (email already in use?)"))
+                known_students.pop(code, None)
+
+    features = [
+        (
+            put_text(text), ", ".join(profile["skills"]), embedding_to_blob(embedding), FEATURES_VERSION, model,
+            *profile_columns(profile), digest, code,
+        )
+        for (_, code, text, digest), profile, embedding in zip(docs, profiles, embeddings)
+        if code in known_students
+    ]
+
+    stored = unchanged + [(member, code) for member, code, _, _ in docs if code in known_students]
+
+    c.executemany(
+        """
+        UPDATE students SET resume_blob = ?, resume_skills = ?, resume_embedding = ?, features_version = ?, features_model = ?,
+        education = ?, degree_level = ?, experience_years = ?, resume_sections = ?, resume_hash = ?
+        WHERE student_code = ?
+        """,
+        features,
+    )
+    if recruiter_code:
+        # applications copy the student's stored resume, as submit_application does; re-importing a
+        # resume replaces the application's copy (idx_recruiter_resumes_application)
+        c.executemany(
+            """
+            INSERT INTO recruiter_resumes
+            (recruiter_code, jd_title, student_code, resume_blob, extracted_resume_skills, resume_embedding,
+             features_version, features_model, education, degree_level, experience_years, resume_sections)
+            SELECT ?, ?, student_code, resume_blob, resume_skills, resume_embedding, features_version, features_model,
+                   education, degree_level, experience_years, resume_sections
+            FROM students WHERE student_code = ?
+            ON CONFLICT (recruiter_code, student_code, jd_title) DO UPDATE SET
+                resume_blob = excluded.resume_blob,
+                extracted_resume_skills = excluded.extracted_resume_skills,
+                resume_embedding = excluded.resume_embedding,
+                features_version = excluded.features_version,
+                features_model = excluded.features_model,
+                education = excluded.education,
+                degree_level = excluded.degree_level,
+                experience_years = excluded.experience_years,
+                resume_sections = excluded.resume_sections,
+                scores_key = NULL,
+                timestamp = CURRENT_TIMESTAMP
+            """,
+            [(recruiter_code, jd_title, code) for _, code in stored],
+        )
+    checkpoints += [(source, member, code, "done", None) for member, code in stored]
+    c.executemany(
+        "INSERT OR REPLACE INTO import_checkpoints (source, member, student_code, state, error) VALUES (?, ?, ?, ?, ?)",
+        checkpoints,
+    )
+    conn.commit()
+    if recruiter_code:
+        query_cache.invalidate(recruiter_code, jd_title)
+
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+    for checkpoint in checkpoints:
+        counts[checkpoint[3]] += 1
+    return counts
+
+
+def import_resumes(path, recruiter_code=None, jd_title=None, manifest=None, workers=IMPORT_WORKERS,
+                   batch_size=IMPORT_BATCH_SIZE, skills_list=None, report=print):
+    """Bulk-load resume PDFs from a directory or zip archive.
+
+    Each resume is stored on the student named by its file name, and also
+    submitted to recruiter_code's jd_title when those are given. Progress is
+    checkpointed per batch, so running the same import again resumes where it
+    stopped (failed and skipped files are retried), and files identical to a
+    student's stored resume are not extracted again. Returns the counts, the
+    elapsed seconds and docs/sec.
+    """
+    skills_list = skills_list if skills_list is not None else get_skills_list()
+    manifest = manifest or {}
+    source = "|".join([os.path.abspath(path), recruiter_code or "", jd_title or ""])
+
+    conn = connect_db()
+    try:
+        done = {row[0] for row in conn.execute(
+            "SELECT member FROM import_checkpoints WHERE source = ? AND state = 'done'", (source,)
+        )}
+        known_students = dict(conn.execute("SELECT student_code, resume_hash FROM students"))
+        todo = [member for member in list_pdfs(path) if member not in done]
+        totals = {"done": 0, "failed": 0, "skipped": 0, "resumed": len(done)}
+        report(f"{len(todo)} PDFs to import, {len(done)} already imported")
+
+        start = time.perf_counter()
+        processed = 0
+        # spawn: workers start clean instead of inheriting the Streamlit / sqlite state of this process
+        with multiprocessing.get_context("spawn").Pool(max(1, workers)) as pool:
+            items = [(path, member, known_students.get(student_code_for(member))) for member in todo]
+            results = pool.imap(_extract, items, chunksize=4)
+            batch = []
+            for result in results:
+                batch.append(result)
+                if len(batch) >= batch_size or processed + len(batch) == len(todo):
+                    counts = _write_batch(
+                        conn, source, batch, skills_list, known_students, manifest, recruiter_code, jd_title
+                    )
+                    for state, count in counts.items():
+                        totals[state] += count
+                    processed += len(batch)
+                    batch = []
+                    elapsed = time.perf_counter() - start
+                    report(f"{processed}/{len(todo)} PDFs, {processed / elapsed:.1f} docs/s")
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = elapsed
+    totals["docs_per_sec"] = processed / elapsed if elapsed else 0.0
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import resume PDFs from a directory or zip archive.")
+    parser.add_argument("path", help="directory or .zip of PDFs named <student_code>.pdf")
+    parser.add_argument("--recruiter", help="also submit every resume to this recruiter's job description")
+    parser.add_argument("--jd-title", help="job description title to submit to (with --recruiter)")
+    parser.add_argument("--manifest", help="CSV with student_code,name,email,password for students without an account")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if bool(args.recruiter) != bool(args.jd_title):
+        parser.error("--recruiter and --jd-title go together")
+    if args.recruiter and not recruiter_exists(args.recruiter):
+        parser.error(f"unknown recruiter {args.recruiter}")
+    if args.recruiter and args.jd_title not in get_job_descriptions(args.recruiter):
+        parser.error(f"{args.recruiter} has no job description titled {args.jd_title!r}")
+
+    totals = import_resumes(
+        args.path, args.recruiter, args.jd_title,
+        manifest=load_manifest(args.manifest) if args.manifest else None,
+        workers=args.workers, batch_size=args.batch_size,
+    )
+    print(
+        f"imported {totals['done']}, failed {totals['failed']}, skipped {totals['skipped']} "
+        f"({totals['resumed']} from an earlier run) in {totals['seconds']:.1f} s, {totals['docs_per_sec']:.1f} docs/s"
+    )
@@ -1,21 +1,123 @@
 
-import sqlite3
+import hashlib
+import atexit
+import logging
+import threading
+from collections import OrderedDict
 from database_func import connect_db
-import google.generativeai as genai
-import os
+import chromadb
 from chromadb.api.types import EmbeddingFunction
 import streamlit as st
+from embedding_func import embed_texts, get_provider
+from blob_store_func import get_text
+from retrieval_func import chunk_document, CHUNK_MAX_CHARS
+
+logger = logging.getLogger(__name__)
+
+UPSERT_BATCH_SIZE = 500
+RECRUITER_STORE = "chroma_db_recruiter"
+STUDENT_STORE = "chroma_db"
+MAX_COLLECTION_HANDLES = 512
 
-genai.configure(api_key=os.environ['GEMINI_API_KEY'])
-def gemini_embedding(text):
-    response = genai.embed_content(content=text, model="models/text-embedding-004")
-    return response['embedding']
 
 class GeminiEmbeddingFunction(EmbeddingFunction):
+    # embeds with the configured provider (Gemini by default, see embedding_func.get_provider)
     def __call__(self, input):
-        return [gemini_embedding(doc) for doc in input]
+        return embed_texts(input).tolist()
+
+
+class ChromaRegistry:
+    """Process-wide Chroma clients and collection handles, shared by all Streamlit sessions.
+
+    One PersistentClient per store path, opened on first use; collection handles
+    are kept per (path, name), the least recently used dropped beyond
+    max_handles. Thread-safe; close() stops a store's client and the next access reopens it.
+    """
+
+    def __init__(self, max_handles=MAX_COLLECTION_HANDLES):
+        self.max_handles = max_handles
+        self._lock = threading.Lock()
+        self._clients = {}  # path -> client
+        self._collections = OrderedDict()  # (path, name) -> collection
+
+    def client(self, path):
+        with self._lock:
+            return self._client(path)
+
+    def _client(self, path):
+        client = self._clients.get(path)
+        if client is None:
+            client = chromadb.PersistentClient(path=path)
+            self._clients[path] = client
+        return client
+
+    def collection(self, path, name, embedding_function=None):
+        key = (path, name)
+        with self._lock:
+            collection = self._collections.get(key)
+            if collection is None:
+                collection = self._client(path).get_or_create_collection(name=name, embedding_function=embedding_function)
+                self._collections[key] = collection
+                while len(self._collections) > self.max_handles:
+                    self._collections.popitem(last=False)
+            else:
+                self._collections.move_to_end(key)
+            return collection
+
+    def close(self, path=None):
+        """Release a store's client, its system (sqlite connections, file handles) and handles, or every store's (at exit)."""
+        with self._lock:
+            for key in [key for key in self._collections if path is None or key[0] == path]:
+                del self._collections[key]
+            if path is None:
+                clients, self._clients = list(self._clients.values()), {}
+            else:
+                clients = [self._clients.pop(path)] if path in self._clients else []
+        if path is not None:
+            for client in clients:
+                _stop_system(client)
+        elif clients:
+            # chromadb shares one system per path between clients; this stops them all
+            clients[0].clear_system_cache()
+
+    def stats(self):
+        with self._lock:
+            return {"clients": sorted(self._clients), "collections": len(self._collections)}
+
+
+def _stop_system(client):
+    # stop the one store's shared system and drop it from chromadb's per-path cache, so the next client
+    # for the path starts a fresh one; clear_system_cache() would stop every store's. Both attributes are
+    # chromadb internals (SharedSystemClient, as of the chromadb version pinned in requirements.txt).
+    systems = getattr(type(client), "_identifier_to_system", None)
+    identifier = getattr(client, "_identifier", None)
+    if systems is None or identifier is None:
+        logger.warning(
+            "chromadb %s has no per-path system cache; the closed store's system was not stopped",
+            getattr(chromadb, "__version__", "?"),
+        )
+        return
+    system = systems.pop(identifier, None)
+    if system is not None:
+        system.stop()
 
 
+chroma_registry = ChromaRegistry()
+atexit.register(chroma_registry.close)
+
+
+def get_recruiter_collection(recruiter_code, embedding_function=None):
+    # vectors of different providers never share a collection
+    return chroma_registry.collection(
+        RECRUITER_STORE, f"recruiter_{recruiter_code}_{get_provider().key}", embedding_function
+    )
+
+
+def get_student_collection(student_code, recruiter_code, embedding_function=None):
+    return chroma_registry.collection(
+        STUDENT_STORE, f"student_{student_code}_recruiter_{recruiter_code}_{get_provider().key}", embedding_function
+    )
+
 
 
 def fetch_job_descriptions(recruiter_code):
@@ -32,73 +134,129 @@ def fetch_job_descriptions(recruiter_code):
     return [{"title": row[0], "description": row[1], "skills": row[2]} for row in data]
 
 
-def fetch_resumes(recruiter_code, job_title):
+def fetch_student_resume(student_code): #single student
+    # the student's current resume (it changes on re-upload), else the copy sent with an application
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT IFNULL(
+            (SELECT resume_blob FROM students WHERE student_code = ?),
+            (SELECT rr.resume_blob FROM recruiter_resumes rr WHERE rr.student_code = ?)
+        )
+    """, (student_code, student_code))
+    data = cursor.fetchone()
+    conn.close()
+    return get_text(data[0]) if data and data[0] else None
+
+
+def fetch_recruiter_resumes(recruiter_code): # every resume sent to any of the recruiter's JDs
     conn = connect_db()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT s.student_code, s.name, rr.resume_text
+        SELECT rr.student_code, rr.resume_blob
         FROM recruiter_resumes rr
-        JOIN students s ON rr.student_code = s.student_code
-        WHERE rr.jd_title = ? AND rr.recruiter_code = ?
-    """, (job_title, recruiter_code))
+        WHERE rr.recruiter_code = ? AND rr.jd_title IN (
+            SELECT jd.title
+            FROM job_descriptions jd
+            JOIN recruiters r ON jd.recruiter_id = r.recruiter_id
+            WHERE r.recruiter_code = ?
+        )
+    """, (recruiter_code, recruiter_code))
     data = cursor.fetchall()
     conn.close()
-    return [{"student_code": row[0], "name": row[1], "resume_text": row[2]} for row in data]
-
+    return [{"student_code": row[0], "resume_text": get_text(row[1])} for row in data]
 
 
-def fetch_student_resume(student_code): #single student
+def index_watermark(recruiter_code):
+    """Cheap fingerprint of the rows a recruiter's collection is built from; changes whenever they do."""
     conn = connect_db()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT rr.resume_text
-        FROM recruiter_resumes rr
-        JOIN students s ON rr.student_code = s.student_code
-        WHERE rr.student_code = ?
-    """, (student_code,))
+        SELECT
+            (SELECT COUNT(*) || ':' || IFNULL(MAX(rr.id), 0) || ':' || IFNULL(MAX(rr.timestamp), '')
+             FROM recruiter_resumes rr WHERE rr.recruiter_code = ?),
+            (SELECT COUNT(*) || ':' || IFNULL(MAX(jd.id), 0)
+             FROM job_descriptions jd JOIN recruiters r ON jd.recruiter_id = r.recruiter_id WHERE r.recruiter_code = ?)
+    """, (recruiter_code, recruiter_code))
     data = cursor.fetchone()
     conn.close()
-    return data[0]
+    return data
 
 
-def index_database_data_for_student(recruiter_code, student_code, chroma_collection):
-   
-    job_descriptions = fetch_job_descriptions(recruiter_code)
+def student_index_watermark(recruiter_code, student_code):
+    """index_watermark for a student's chat collection; also changes when the student re-uploads a resume."""
+    conn = connect_db()
+    cursor = conn.cursor()
+    # resume_blob is the content hash of the stored text
+    cursor.execute("SELECT resume_blob FROM students WHERE student_code = ?", (student_code,))
+    data = cursor.fetchone()
+    conn.close()
+    return (recruiter_code, data[0] if data else None) + index_watermark(recruiter_code)
+
+
+def content_hash(text):
+    # the chunk size is part of the hash so changing it re-chunks every document
+    return hashlib.sha256(f"{CHUNK_MAX_CHARS}:{text or ''}".encode("utf-8")).hexdigest()
+
+
+def sync_collection(chroma_collection, documents, batch_size=UPSERT_BATCH_SIZE):
+    """Make chroma_collection hold the section chunks of exactly `documents` ({id: text}).
 
-    for jd in job_descriptions:
-        chroma_collection.add(
-            ids=[f"jd_{jd['title']}"],
-            documents=[jd["description"]],
+    Each document is stored as chunks "{id}#{n}" tagged with its source id and
+    content hash. Only documents whose hash changed are re-chunked and
+    re-embedded via batched upserts; chunks of removed or changed documents are
+    deleted. Returns (upserted documents, deleted documents) counts.
+    """
+    existing = chroma_collection.get(include=["metadatas"])
+    stored_hashes, stored_chunks = {}, {}
+    for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+        metadata = metadata or {}
+        source = metadata.get("source", chunk_id)
+        stored_hashes[source] = metadata.get("content_hash")
+        stored_chunks.setdefault(source, []).append(chunk_id)
+
+    hashes = {doc_id: content_hash(text) for doc_id, text in documents.items()}
+    changed = [doc_id for doc_id, digest in hashes.items() if stored_hashes.get(doc_id) != digest]
+    removed = [doc_id for doc_id in stored_hashes if doc_id not in documents]
+
+    stale_chunks = [chunk_id for doc_id in changed + removed for chunk_id in stored_chunks.get(doc_id, [])]
+    for start in range(0, len(stale_chunks), batch_size):
+        chroma_collection.delete(ids=stale_chunks[start:start + batch_size])
+
+    chunks = [
+        (f"{doc_id}#{n}", chunk, {"source": doc_id, "chunk": n, "content_hash": hashes[doc_id]})
+        for doc_id in changed
+        for n, chunk in enumerate(chunk_document(documents[doc_id]))
+    ]
+    # embed every changed chunk up front so the provider's batches run concurrently
+    embeddings = embed_texts([chunk[1] for chunk in chunks]).tolist() if chunks else []
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        chroma_collection.upsert(
+            ids=[chunk[0] for chunk in batch],
+            documents=[chunk[1] for chunk in batch],
+            metadatas=[chunk[2] for chunk in batch],
+            embeddings=embeddings[start:start + batch_size],
         )
+    return len(changed), len(removed)
+
+
+def index_database_data_for_student(recruiter_code, student_code, chroma_collection):
+   
+    documents = {f"jd_{jd['title']}": jd["description"] for jd in fetch_job_descriptions(recruiter_code)}
     
     # Fetch the single student's resume
     resume_text = fetch_student_resume(student_code)
     
     if resume_text:
-        chroma_collection.add(
-            ids=[f"resume_{student_code}"],
-            documents=[resume_text],
-        )
+        documents[f"resume_{student_code}"] = resume_text
     else:
         st.write(f"No resume found for student_code: {student_code}")
+    return sync_collection(chroma_collection, documents)
 
 def index_database_data_for_recruiter(recruiter_code, chroma_collection):
 
-    job_descriptions = fetch_job_descriptions(recruiter_code)
-    
-    for jd in job_descriptions:
-        chroma_collection.add(
-            ids=[f"jd_{jd['title']}"],
-            documents=[jd["description"]],
-        )
-    
-
-    for jd in job_descriptions:
-        resumes = fetch_resumes(recruiter_code, jd["title"])
-        for resume in resumes:
-            chroma_collection.add(
-                ids=[f"resume_{resume['student_code']}"],
-                documents=[resume["resume_text"]],
-            )
-
-    
+    documents = {f"jd_{jd['title']}": jd["description"] for jd in fetch_job_descriptions(recruiter_code)}
+    for resume in fetch_recruiter_resumes(recruiter_code):
+        documents[f"resume_{resume['student_code']}"] = resume["resume_text"]
+    return sync_collection(chroma_collection, documents)
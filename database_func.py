@@ -1,20 +1,102 @@
 import sqlite3
+import queue
 import streamlit as st
 import os
 import atexit
+import logging
 import shutil
-import re
+import hashlib
+import numpy as np
+from profile_func import get_scanner, profile_columns
+from blob_store_func import get_text, put_blob, put_text
+from query_cache_func import query_cache
+from embedding_func import embed_texts, get_provider, embedding_to_blob, blob_to_embedding
+from ranking_func import score_candidates
+
+
+# bump when skill extraction or the embedding model changes so stored features get recomputed
+FEATURES_VERSION = 2
+
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "smartmatch.db"
+SCORE_BATCH = 2000  # applications read, scored and written per transaction by score_applications
+POOL_SIZE = 16
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,  # KiB, i.e. 64 MB page cache per connection
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool instead of closing it."""
+
+    pool = None
+
+    def close(self):
+        if self.pool is None:
+            return super().close()
+        if self.in_transaction:
+            self.rollback()
+        self.pool.release(self)
+
+
+class ConnectionPool:
+    """Thread-safe pool of configured connections to one SQLite file."""
+
+    def __init__(self, path, size=POOL_SIZE, pragmas=PRAGMAS):
+        self.path = path
+        self.pragmas = pragmas
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.pragmas.get("busy_timeout", 5000) / 1000,
+            factory=PooledConnection,
+            check_same_thread=False,  # a connection is only used by one thread at a time, between acquire and release
+            cached_statements=256,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.pool = self
+        return conn
 
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
 
-def connect_db():
-    conn = sqlite3.connect("smartmatch.db")
-    return conn
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            sqlite3.Connection.close(conn)
 
+    def close_all(self):
+        while True:
+            try:
+                sqlite3.Connection.close(self._idle.get_nowait())
+            except queue.Empty:
+                return
 
-def create_tables():
-    conn = connect_db()
-    c = conn.cursor()
 
+_pool = ConnectionPool(DB_PATH)
+atexit.register(_pool.close_all)
+
+
+def connect_db():
+    # conn.close() returns the connection to the pool
+    return _pool.acquire()
+
+
+def _migration_base_tables(c):
     # recruiters table
     c.execute(
         """
@@ -71,8 +153,255 @@ def create_tables():
 
         """
     )
-    conn.commit()
-    conn.close()
+
+
+def _migration_features(c):
+    # precomputed skills and skill embeddings, filled at upload time
+    _add_column(c, "students", "resume_skills", "TEXT DEFAULT NULL")
+    _add_column(c, "students", "resume_embedding", "BLOB DEFAULT NULL")
+    _add_column(c, "students", "features_version", "INTEGER DEFAULT NULL")
+    _add_column(c, "recruiter_resumes", "resume_embedding", "BLOB DEFAULT NULL")
+    _add_column(c, "recruiter_resumes", "features_version", "INTEGER DEFAULT NULL")
+    _add_column(c, "job_descriptions", "skills_embedding", "BLOB DEFAULT NULL")
+    _add_column(c, "job_descriptions", "features_version", "INTEGER DEFAULT NULL")
+
+
+def _migration_indexes(c):
+    """One application per (recruiter, student, job title), plus the lookup indexes.
+
+    Existing duplicate applications are removed before the unique index is created: the
+    oldest is kept, the others are moved to recruiter_resumes_duplicates and their number logged.
+    """
+    duplicates = "id NOT IN (SELECT MIN(id) FROM recruiter_resumes GROUP BY recruiter_code, student_code, jd_title)"
+    c.execute("CREATE TABLE IF NOT EXISTS recruiter_resumes_duplicates AS SELECT * FROM recruiter_resumes WHERE 0")
+    c.execute(f"INSERT INTO recruiter_resumes_duplicates SELECT * FROM recruiter_resumes WHERE {duplicates}")
+    if c.rowcount > 0:
+        logger.warning("removed %d duplicate applications (kept in recruiter_resumes_duplicates)", c.rowcount)
+    c.execute(f"DELETE FROM recruiter_resumes WHERE {duplicates}")
+    c.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_recruiter_resumes_application "
+        "ON recruiter_resumes (recruiter_code, student_code, jd_title)"
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_recruiter_resumes_jd ON recruiter_resumes (recruiter_code, jd_title)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_recruiter_resumes_student ON recruiter_resumes (student_code)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_descriptions_recruiter ON job_descriptions (recruiter_id, title)")
+
+
+def _migration_features_model(c):
+    # embedding provider that produced the stored vectors, see embedding_func.get_provider
+    for table in ("students", "recruiter_resumes", "job_descriptions"):
+        _add_column(c, table, "features_model", "TEXT DEFAULT NULL")
+
+
+def _migration_jobs(c):
+    # background work queue, see job_queue_func
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            dedupe_key TEXT NOT NULL,
+            params TEXT NOT NULL,
+            data BLOB DEFAULT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after REAL NOT NULL DEFAULT 0,
+            lease_expires REAL DEFAULT NULL,
+            result TEXT DEFAULT NULL,
+            error TEXT DEFAULT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (kind, dedupe_key)
+        )
+        """
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (state, run_after)")
+
+
+def _migration_ocr_cache(c):
+    # OCR text of scanned pages keyed by a hash of the rendered page, see pdf_func
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ocr_cache (
+            page_hash TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def _migration_import_checkpoints(c):
+    # files already ingested by bulk_import_func, so an interrupted import can resume
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT NOT NULL,
+            member TEXT NOT NULL,
+            student_code TEXT DEFAULT NULL,
+            state TEXT NOT NULL,
+            error TEXT DEFAULT NULL,
+            imported_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, member)
+        )
+        """
+    )
+
+
+def _migration_resume_hash(c):
+    # sha256 of the PDF a student's resume text was extracted from, to skip re-extracting the same file
+    _add_column(c, "students", "resume_hash", "TEXT DEFAULT NULL")
+
+
+def _migration_blobs(c):
+    # resume texts and JD PDFs move to the content-addressed blob store; the tables keep the SHA-256 key.
+    # Writing a blob is idempotent, so a rolled-back migration only leaves unreferenced blobs behind.
+    _add_column(c, "students", "resume_blob", "TEXT DEFAULT NULL")
+    _add_column(c, "recruiter_resumes", "resume_blob", "TEXT DEFAULT NULL")
+    _add_column(c, "job_descriptions", "jd_pdf_blob", "TEXT DEFAULT NULL")
+
+    keys = {}
+    for table, id_column, text_column in (
+        ("students", "student_id", "pdf_location"),
+        ("recruiter_resumes", "id", "resume_text"),
+    ):
+        c.execute(f"SELECT {id_column}, {text_column} FROM {table} WHERE {text_column} IS NOT NULL")
+        updates = []
+        for row_id, text in c.fetchall():
+            if text not in keys:
+                keys[text] = put_text(text)
+            updates.append((keys[text], row_id))
+        c.executemany(f"UPDATE {table} SET resume_blob = ? WHERE {id_column} = ?", updates)
+
+    c.execute("SELECT id, jd_pdf_location FROM job_descriptions WHERE jd_pdf_location IS NOT NULL")
+    updates = []
+    for jd_id, location in c.fetchall():
+        if os.path.exists(location):
+            with open(location, "rb") as f:
+                updates.append((put_blob(f.read()), jd_id))
+    c.executemany("UPDATE job_descriptions SET jd_pdf_blob = ? WHERE id = ?", updates)
+
+    c.execute("ALTER TABLE students DROP COLUMN pdf_location")
+    c.execute("ALTER TABLE recruiter_resumes DROP COLUMN resume_text")
+    c.execute("ALTER TABLE job_descriptions DROP COLUMN jd_pdf_location")
+
+
+def _migration_profiles(c):
+    # structured fields extracted with the skills (profile_func); filled as features are (re)computed
+    for table in ("students", "recruiter_resumes"):
+        _add_column(c, table, "education", "TEXT DEFAULT NULL")
+        _add_column(c, table, "degree_level", "INTEGER DEFAULT NULL")
+        _add_column(c, table, "experience_years", "REAL DEFAULT NULL")
+        _add_column(c, table, "resume_sections", "TEXT DEFAULT NULL")
+
+
+def _migration_embedding_changes(c):
+    # the last change of every student's resume embedding, in commit order; ann_index_func replays the
+    # changes after the seq its index file was built at. One row per student, so the log stays bounded.
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS student_embedding_changes (
+            student_id INTEGER PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )
+        """
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_student_embedding_changes_seq ON student_embedding_changes (seq)")
+    log_change = """
+        INSERT OR REPLACE INTO student_embedding_changes (student_id, seq)
+        VALUES ({student}.student_id, (SELECT IFNULL(MAX(seq), 0) + 1 FROM student_embedding_changes));
+    """
+    c.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_students_embedding_insert AFTER INSERT ON students "
+        f"WHEN NEW.resume_embedding IS NOT NULL BEGIN {log_change.format(student='NEW')} END"
+    )
+    c.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_students_embedding_update AFTER UPDATE OF resume_embedding, features_model ON students "
+        f"BEGIN {log_change.format(student='NEW')} END"
+    )
+    c.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_students_embedding_delete AFTER DELETE ON students "
+        f"BEGIN {log_change.format(student='OLD')} END"
+    )
+    c.execute(
+        "INSERT OR IGNORE INTO student_embedding_changes (student_id, seq) "
+        "SELECT student_id, ROW_NUMBER() OVER (ORDER BY student_id) FROM students WHERE resume_embedding IS NOT NULL"
+    )
+
+
+def _migration_application_scores(c):
+    # scores of every application against its job description, so the shortlist filters, sorts and
+    # paginates in SQL; scores_key / bm25_key record what they were computed against
+    for column, definition in (
+        ("resume_score", "REAL"), ("skill_overlap", "INTEGER"), ("scores_key", "TEXT"),
+        ("bm25_score", "REAL"), ("bm25_key", "TEXT"),
+    ):
+        _add_column(c, "recruiter_resumes", column, f"{definition} DEFAULT NULL")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_recruiter_resumes_score ON recruiter_resumes (recruiter_code, jd_title, resume_score)"
+    )
+
+
+# schema migrations, applied in order; PRAGMA user_version holds how many have run
+MIGRATIONS = [
+    _migration_base_tables,
+    _migration_features,
+    _migration_indexes,
+    _migration_features_model,
+    _migration_jobs,
+    _migration_ocr_cache,
+    _migration_import_checkpoints,
+    _migration_resume_hash,
+    _migration_blobs,
+    _migration_profiles,
+    _migration_embedding_changes,
+    _migration_application_scores,
+]
+
+
+def migrate(conn, target_version=None):
+    """Apply pending MIGRATIONS up to target_version (default: all), one transaction each."""
+    target_version = len(MIGRATIONS) if target_version is None else target_version
+    # an up-to-date database is the common case; checking it needs no write lock
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= target_version:
+        return version
+    while True:
+        # BEGIN IMMEDIATE takes the write lock so concurrent app processes migrate one at a time
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= target_version:
+                conn.rollback()
+                return version
+            MIGRATIONS[version](conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+_schema_ready = set()
+
+
+def create_tables():
+    """Bring DB_PATH up to the latest schema, once per process."""
+    if DB_PATH in _schema_ready:
+        return
+    conn = connect_db()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+    _schema_ready.add(DB_PATH)
+
+
+def _add_column(cursor, table, column, definition):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
 
 def add_recruiter(recruiter_code, password, email):
@@ -144,15 +473,83 @@ def student_exists(student_code):
 
 
 def extract_skills(text, skills_list):
-    skills = []
-
-    for skill in skills_list:
-        pattern = r"\b{}\b".format(re.escape(skill))
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            skills.append(skill)
-
-    return skills
+    # single trie scan over the text, same \b / case-insensitive semantics as the per-skill regex loop
+    return get_scanner(skills_list).skills(text)
+
+
+def compute_features(texts, skills_list):
+    """Extract skills from each text and embed the skill strings in one batch.
+
+    Returns (list of skill lists, embedding matrix); skills keep library order so
+    the embedded ", "-joined string is the same wherever it is computed.
+    """
+    all_skills = [extract_skills(text, skills_list) if skills_list else [] for text in texts]
+    embeddings = embed_texts([", ".join(skills) for skills in all_skills])
+    return all_skills, embeddings
+
+
+def compute_resume_features(texts, skills_list):
+    """Like compute_features for resumes: (list of profiles, embedding matrix).
+
+    A profile (profile_func.ResumeScanner.scan) holds the skills together with education, degree
+    level, stated years of experience and section offsets, all from one scan of the text.
+    """
+    scanner = get_scanner(skills_list) if skills_list else None
+    profiles = [
+        scanner.scan(text) if scanner else {"skills": [], "education": [], "degree_level": 0, "experience_years": None, "sections": []}
+        for text in texts
+    ]
+    embeddings = embed_texts([", ".join(profile["skills"]) for profile in profiles])
+    return profiles, embeddings
+
+
+def split_skills(skills_str):
+    return skills_str.split(", ") if skills_str else []
+
+
+# feature columns _refresh_features reads and writes by name
+FEATURE_COLUMNS = ("skills", "embedding", "features_version", "features_model")
+PROFILE_COLUMNS = ("education", "degree_level", "experience_years", "resume_sections")
+
+
+def _refresh_features(cursor, rows, skills_list, update_sql, load_text=None, profiles=False):
+    """Recompute features for rows stored without them, with an older FEATURES_VERSION or another embedding model.
+
+    Rows are sqlite3.Row (or dicts) with the columns id, source (the text) and FEATURE_COLUMNS;
+    update_sql takes FEATURE_COLUMNS and id as named parameters. When source holds blob keys
+    instead of text, pass load_text=get_text; every distinct blob is processed once however
+    many rows share it. Resume rows pass profiles=True: they also have PROFILE_COLUMNS, which
+    update_sql takes too. Returns the rows as dicts with fresh features.
+    """
+    model = get_provider().name
+    rows = [dict(row) for row in rows]
+    stale = [
+        row for row in rows
+        if row["embedding"] is None or row["features_version"] != FEATURES_VERSION or row["features_model"] != model
+    ]
+    if not stale:
+        return rows
+
+    sources = list(dict.fromkeys(row["source"] for row in stale))
+    texts = [load_text(source) for source in sources] if load_text else sources
+    if profiles:
+        resume_profiles, embeddings = compute_resume_features(texts, skills_list)
+        all_skills = [profile["skills"] for profile in resume_profiles]
+        extra = [dict(zip(PROFILE_COLUMNS, profile_columns(profile))) for profile in resume_profiles]
+    else:
+        all_skills, embeddings = compute_features(texts, skills_list)
+        extra = [{}] * len(sources)
+    features = {
+        source: {
+            "skills": ", ".join(skills), "embedding": embedding_to_blob(embedding),
+            "features_version": FEATURES_VERSION, "features_model": model, **columns,
+        }
+        for source, skills, embedding, columns in zip(sources, all_skills, embeddings, extra)
+    }
+    for row in stale:
+        row.update(features[row["source"]])
+    cursor.executemany(update_sql, [{**features[row["source"]], "id": row["id"]} for row in stale])
+    return rows
 
 def save_job_description(recruiter_code, title, job_description, jd_pdf_file=None, skills_list=None):
     conn = connect_db()
@@ -163,31 +560,27 @@ def save_job_description(recruiter_code, title, job_description, jd_pdf_file=Non
         recruiter = c.fetchone()
         if recruiter:
             recruiter_id = recruiter[0]
-            pdf_location = None
-            
-           
-            if jd_pdf_file:
-                pdf_dir = "jd_pdfs"
-                os.makedirs(pdf_dir, exist_ok=True)
-                sanitized_title = re.sub(r'[^\w\-_\. ]', '_', title)
-                pdf_file_path = os.path.join(pdf_dir, f"{sanitized_title}_{recruiter_id}.pdf")
-                with open(pdf_file_path, "wb") as f:
-                    f.write(jd_pdf_file.getbuffer())
-                pdf_location = pdf_file_path
+            # the PDF goes to the blob store; re-uploading the same file stores nothing new
+            pdf_blob = put_blob(jd_pdf_file.getbuffer()) if jd_pdf_file else None
 
             
-            extracted_skills = []
-            if skills_list:
-                extracted_skills = extract_skills(job_description, skills_list)
-            extracted_skills = list(set(extracted_skills))
+            [extracted_skills], embeddings = compute_features([job_description], skills_list)
             skills_str = ", ".join(extracted_skills) 
 
             
             c.execute(
-                "INSERT INTO job_descriptions (recruiter_id, title, description, jd_pdf_location, skills) VALUES (?, ?, ?, ?, ?)",
-                (recruiter_id, title, job_description, pdf_location, skills_str),
+                """
+                INSERT INTO job_descriptions
+                (recruiter_id, title, description, jd_pdf_blob, skills, skills_embedding, features_version, features_model)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    recruiter_id, title, job_description, pdf_blob, skills_str,
+                    embedding_to_blob(embeddings[0]), FEATURES_VERSION, get_provider().name,
+                ),
             )
             conn.commit()
+            query_cache.invalidate(recruiter_code, title)
             return True
         else:
             st.error("Recruiter not found.")
@@ -200,6 +593,7 @@ def save_job_description(recruiter_code, title, job_description, jd_pdf_file=Non
 
 
 
+@query_cache.cached()
 def get_job_descriptions(recruiter_code):
     conn = connect_db()
     c = conn.cursor()
@@ -247,6 +641,7 @@ def delete_all_job_descriptions(recruiter_code):
            
             c.execute("DELETE FROM job_descriptions WHERE recruiter_id = ?", (recruiter_id,))
             conn.commit()
+            query_cache.invalidate(recruiter_code)
             return True
         else:
             st.error("Recruiter not found.")
@@ -257,9 +652,267 @@ def delete_all_job_descriptions(recruiter_code):
     finally:
         conn.close()
 
+
+def save_student_resume(student_code, resume_text, skills_list, resume_hash=None):
+    """Store the student's resume text with its skills, skill embedding and profile; returns the skills.
+
+    resume_hash is the file_hash of the PDF the text came from, see get_resume_hash.
+    """
+    [profile], embeddings = compute_resume_features([resume_text], skills_list)
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute(
+        """
+        UPDATE students SET resume_blob = ?, resume_skills = ?, resume_embedding = ?, features_version = ?, features_model = ?,
+        education = ?, degree_level = ?, experience_years = ?, resume_sections = ?, resume_hash = ?
+        WHERE student_code = ?
+        """,
+        (
+            put_text(resume_text), ", ".join(profile["skills"]), embedding_to_blob(embeddings[0]), FEATURES_VERSION,
+            get_provider().name, *profile_columns(profile), resume_hash, student_code,
+        ),
+    )
+    conn.commit()
+    conn.close()
+    return profile["skills"]
+
+
+def get_resume_hash(student_code):
+    """Hash of the PDF the student's stored resume text was extracted from, or None."""
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute("SELECT resume_hash FROM students WHERE student_code = ? AND resume_blob IS NOT NULL", (student_code,))
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def get_student_features(student_code, skills_list):
+    """(resume_text, skills, embedding) of a student's stored resume, or None if nothing was uploaded."""
+    conn = connect_db()
+    c = conn.cursor()
+    c.row_factory = sqlite3.Row
+    c.execute(
+        """
+        SELECT student_id AS id, resume_blob AS source, resume_skills AS skills, resume_embedding AS embedding,
+               features_version, features_model, education, degree_level, experience_years, resume_sections
+        FROM students WHERE student_code = ?
+        """,
+        (student_code,),
+    )
+    row = c.fetchone()
+    if not row or not row["source"]:
+        conn.close()
+        return None
+
+    # resumes uploaded before features were stored get them computed once here
+    [row] = _refresh_features(
+        c, [row], skills_list,
+        """
+        UPDATE students SET resume_skills = :skills, resume_embedding = :embedding, features_version = :features_version,
+        features_model = :features_model, education = :education, degree_level = :degree_level,
+        experience_years = :experience_years, resume_sections = :resume_sections
+        WHERE student_id = :id
+        """,
+        load_text=get_text, profiles=True,
+    )
+    conn.commit()
+    conn.close()
+    return get_text(row["source"]), split_skills(row["skills"]), blob_to_embedding(row["embedding"])
+
+
+def submit_application(recruiter_code, student_code, jd_title):
+    """Send the student's stored resume (a reference to its blob) and its precomputed features to a recruiter's job description.
+
+    Returns False if the student already applied to it.
+    """
+    conn = connect_db()
+    c = conn.cursor()
+    try:
+        c.execute(
+            """
+            INSERT INTO recruiter_resumes
+            (recruiter_code, student_code, resume_blob, jd_title, extracted_resume_skills, resume_embedding, features_version, features_model,
+             education, degree_level, experience_years, resume_sections)
+            SELECT ?, student_code, resume_blob, ?, resume_skills, resume_embedding, features_version, features_model,
+                   education, degree_level, experience_years, resume_sections
+            FROM students WHERE student_code = ?
+            """,
+            (recruiter_code, jd_title, student_code),
+        )
+        conn.commit()
+        query_cache.invalidate(recruiter_code, jd_title)
+        return True
+    except sqlite3.IntegrityError:
+        # idx_recruiter_resumes_application: already applied
+        return False
+    finally:
+        conn.close()
+
+
+def withdraw_application(recruiter_code, student_code, jd_title):
+    """Delete a student's application; returns False if there was none."""
+    conn = connect_db()
+    c = conn.cursor()
+    try:
+        c.execute(
+            "DELETE FROM recruiter_resumes WHERE recruiter_code = ? AND student_code = ? AND jd_title = ?",
+            (recruiter_code, student_code, jd_title),
+        )
+        conn.commit()
+        query_cache.invalidate(recruiter_code, jd_title)
+        return c.rowcount > 0
+    finally:
+        conn.close()
+
+
+# refreshed features of an application also invalidate its scores
+_APPLICATION_FEATURES_UPDATE = """
+    UPDATE recruiter_resumes SET extracted_resume_skills = :skills, resume_embedding = :embedding,
+    features_version = :features_version, features_model = :features_model, education = :education,
+    degree_level = :degree_level, experience_years = :experience_years, resume_sections = :resume_sections, scores_key = NULL
+    WHERE id = :id
+"""
+
+
+@query_cache.cached(jd_param="title")
+def fetch_job_features(recruiter_code, skills_list, title=None):
+    """A recruiter's job descriptions (optionally just one title) with their stored skills and embeddings."""
+    conn = connect_db()
+    c = conn.cursor()
+    c.row_factory = sqlite3.Row
+    query = """
+        SELECT jd.id, jd.title, jd.description AS source, jd.skills, jd.skills_embedding AS embedding,
+               jd.features_version, jd.features_model
+        FROM job_descriptions jd
+        JOIN recruiters r ON jd.recruiter_id = r.recruiter_id
+        WHERE r.recruiter_code = ?
+    """
+    params = (recruiter_code,)
+    if title is not None:
+        query += " AND jd.title = ?"
+        params += (title,)
+    c.execute(query, params)
+    rows = _refresh_features(
+        c, c.fetchall(), skills_list,
+        """
+        UPDATE job_descriptions SET skills = :skills, skills_embedding = :embedding, features_version = :features_version,
+        features_model = :features_model WHERE id = :id
+        """,
+    )
+    conn.commit()
+    conn.close()
+
+    return [
+        {"title": row["title"], "skills": split_skills(row["skills"]), "embedding": blob_to_embedding(row["embedding"])}
+        for row in rows
+    ]
+
+
+@query_cache.cached(jd_param="title")
+def get_job_skills(recruiter_code, title):
+    """Stored skills string of one of a recruiter's job descriptions, or None."""
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute(
+        "SELECT jd.skills FROM job_descriptions jd JOIN recruiters r ON jd.recruiter_id = r.recruiter_id WHERE r.recruiter_code = ? AND jd.title = ?",
+        (recruiter_code, title),
+    )
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def score_applications(recruiter_code, jd_title, skills_list, application_ids=None):
+    """Store resume_score (cosine * 100) and skill_overlap of a job description's applications.
+
+    Only applications not yet scored against the JD's current features are scored, just
+    those among application_ids when given, SCORE_BATCH per transaction. Returns how many
+    were scored.
+    """
+    jd = fetch_job_features(recruiter_code, skills_list, title=jd_title)
+    if not jd:
+        return 0
+    jd_skills, jd_embedding = jd[0]["skills"], jd[0]["embedding"]
+    key = hashlib.sha256(
+        f"{', '.join(jd_skills)}|{get_provider().name}|".encode("utf-8") + jd_embedding.tobytes()
+    ).hexdigest()[:16]
+
+    conn = connect_db()
+    c = conn.cursor()
+    pending_sql = """
+        SELECT id FROM recruiter_resumes
+        WHERE recruiter_code = ? AND jd_title = ? AND scores_key IS NOT ?
+    """
+    if application_ids is None:
+        pending = [row[0] for row in c.execute(pending_sql, (recruiter_code, jd_title, key))]
+    else:
+        pending = []
+        ids = list(application_ids)
+        for start in range(0, len(ids), SCORE_BATCH):
+            batch = ids[start:start + SCORE_BATCH]
+            c.execute(f"{pending_sql} AND id IN ({', '.join('?' * len(batch))})", (recruiter_code, jd_title, key, *batch))
+            pending += [row[0] for row in c.fetchall()]
+
+    jd_skill_set = set(jd_skills)
+    c.row_factory = sqlite3.Row
+    for start in range(0, len(pending), SCORE_BATCH):
+        batch = pending[start:start + SCORE_BATCH]
+        c.execute(
+            f"""
+            SELECT id, resume_blob AS source, extracted_resume_skills AS skills, resume_embedding AS embedding,
+                   features_version, features_model, education, degree_level, experience_years, resume_sections
+            FROM recruiter_resumes WHERE id IN ({', '.join('?' * len(batch))})
+            """,
+            batch,
+        )
+        rows = _refresh_features(c, c.fetchall(), skills_list, _APPLICATION_FEATURES_UPDATE, load_text=get_text, profiles=True)
+        scores = score_candidates(jd_embedding, np.vstack([blob_to_embedding(row["embedding"]) for row in rows]))
+        c.executemany(
+            "UPDATE recruiter_resumes SET resume_score = ?, skill_overlap = ?, scores_key = ? WHERE id = ?",
+            [
+                (float(score), len(jd_skill_set.intersection(split_skills(row["skills"]))), key, row["id"])
+                for row, score in zip(rows, scores)
+            ],
+        )
+        conn.commit()
+    conn.close()
+    return len(pending)
+
+
+@query_cache.cached(jd_param="jd_title")
+def fetch_applicants(recruiter_code, jd_title):
+    """(student_code, name, email, resume_blob, timestamp) of everyone who applied to a job description."""
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute(
+        """
+        SELECT s.student_code, s.name, s.email, rr.resume_blob, rr.timestamp
+        FROM recruiter_resumes rr
+        JOIN students s ON rr.student_code = s.student_code
+        WHERE rr.jd_title = ? AND rr.recruiter_code = ?
+        """,
+        (jd_title, recruiter_code),
+    )
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+@query_cache.cached()
+def get_recruiter_email(recruiter_code):
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute("SELECT email FROM recruiters WHERE recruiter_code = ?", (recruiter_code,))
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
 def unlink_database():
     """Delete the database file when the application closes."""
-    db_path = "smartmatch.db"
+    db_path = DB_PATH
+    _pool.close_all()
     if os.path.exists(db_path):
         try:
             os.unlink(db_path)
@@ -0,0 +1,330 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import google.generativeai as genai
+import numpy as np
+
+from async_client_func import RateLimitError, embedding_client, run_sync
+from resources_func import configure_genai
+
+
+# gemini (remote), http (remote, see HttpProvider), local (sentence-transformers on CPU, hashing if not installed) or hashing
+EMBEDDING_BACKEND = os.environ.get("SMARTMATCH_EMBEDDING_BACKEND", "gemini")
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_URL = os.environ.get("SMARTMATCH_EMBEDDING_URL", "http://127.0.0.1:8765/embed")
+LOCAL_EMBEDDING_MODEL = os.environ.get("SMARTMATCH_LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+HASHING_DIM = 1024
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath("smartmatch.db")), "embedding_cache.db")
+CACHE_MAX_ENTRIES = 200_000
+EMBED_BATCH_SIZE = 100  # max contents per embed_content request
+
+
+def normalize_text(text):
+    return " ".join((text or "").split())
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def embedding_to_blob(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def blob_to_embedding(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class EmbeddingCache:
+    """Persistent (model, text hash) -> float32 vector cache with an LRU size cap."""
+
+    def __init__(self, path=CACHE_DB_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get(self, model, key):
+        return self.get_many(model, [key]).get(key)
+
+    def get_many(self, model, keys):
+        """Look up several text hashes at once; returns {key: vector} for the hits only."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *chunk),
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = blob_to_embedding(blob)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, model, key, vector):
+        self.put_many(model, {key: vector})
+
+    def put_many(self, model, vectors):
+        if not vectors:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in vectors.items():
+            rows.append((model, key, len(vector), embedding_to_blob(vector), now))
+        with self._lock:
+            # only new keys grow the cache; keys already stored are overwritten without counting them
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            inserted = self._conn.total_changes - before
+            if inserted < len(rows):
+                self._conn.executemany(
+                    "UPDATE embeddings SET dim = ?, vector = ?, last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(dim, blob, used, row_model, key) for row_model, key, dim, blob, used in rows],
+                )
+            self._entries += inserted
+            if self._entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # trim to 90% of the cap so eviction does not run on every insert
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._entries - int(self.max_entries * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._entries -= excess
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": self._entries,
+        }
+
+
+embedding_cache = EmbeddingCache()
+
+
+class EmbeddingProvider:
+    """Turns a batch of texts into a (len(texts), dim) float32 matrix.
+
+    `name` identifies the model and is used as the cache key, so vectors of
+    different backends never mix; `key` is a short tag for collection names.
+    Batches of `remote` providers are sent concurrently through
+    async_client_func.embedding_client.
+    """
+
+    name = None
+    key = None
+    batch_size = EMBED_BATCH_SIZE
+    remote = False
+
+    def embed(self, texts):
+        raise NotImplementedError
+
+
+class GeminiProvider(EmbeddingProvider):
+    name = EMBEDDING_MODEL
+    key = "gemini"
+    batch_size = EMBED_BATCH_SIZE
+    remote = True
+
+    def __init__(self):
+        configure_genai()
+
+    def embed(self, texts):
+        response = genai.embed_content(content=list(texts), model=self.name)
+        return np.asarray(response['embedding'], dtype=np.float32)
+
+
+class HttpProvider(EmbeddingProvider):
+    """Embedding service speaking a minimal JSON protocol, e.g. benchmarks/fake_embedding_server.py.
+
+    POST {"texts": [...]} to url -> {"embeddings": [[...], ...]}; a 429 is raised as RateLimitError.
+    """
+
+    key = "http"
+    batch_size = EMBED_BATCH_SIZE
+    remote = True
+
+    def __init__(self, url=EMBEDDING_URL, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self.name = f"http/{url}"
+
+    def embed(self, texts):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"texts": list(texts)}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                embeddings = json.load(response)["embeddings"]
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                retry_after = e.headers.get("Retry-After")
+                raise RateLimitError(f"429 from {self.url}", float(retry_after) if retry_after else None) from e
+            raise
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class SentenceTransformerProvider(EmbeddingProvider):
+    """Local CPU model, e.g. the all-MiniLM-L6-v2 tried in resume_parser.ipynb."""
+
+    key = "st"
+    batch_size = 64
+
+    def __init__(self, model_name=LOCAL_EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = f"sentence-transformers/{model_name}"
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(self, texts):
+        return self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True).astype(np.float32)
+
+
+class HashingProvider(EmbeddingProvider):
+    """Dependency-free fallback: signed feature hashing of sublinear term frequencies.
+
+    Terms are the comma-separated phrases (whole skills) plus their words, so
+    skill lists that share skills or words land close together.
+    """
+
+    key = "hash"
+    batch_size = 1000
+    _TOKEN = re.compile(r"[a-z0-9+#.]+")
+
+    def __init__(self, dim=HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-tf/{dim}"
+
+    def _terms(self, text):
+        text = text.lower()
+        phrases = [phrase.strip() for phrase in text.split(",") if phrase.strip()]
+        return phrases + self._TOKEN.findall(text)
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for term in self._terms(text):
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                matrix[row, bucket] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(backend=None):
+    """The embedding provider selected by SMARTMATCH_EMBEDDING_BACKEND (gemini, http, local or hashing), created once."""
+    backend = backend or EMBEDDING_BACKEND
+    with _providers_lock:
+        if backend not in _providers:
+            if backend == "gemini":
+                _providers[backend] = GeminiProvider()
+            elif backend == "local":
+                try:
+                    _providers[backend] = SentenceTransformerProvider()
+                except ImportError:
+                    # sentence-transformers is optional; fall back to the hashing backend
+                    _providers[backend] = HashingProvider()
+            elif backend == "http":
+                _providers[backend] = HttpProvider()
+            elif backend == "hashing":
+                _providers[backend] = HashingProvider()
+            else:
+                raise ValueError(f"Unknown embedding backend: {backend}")
+        return _providers[backend]
+
+
+def embed_texts(texts, provider=None):
+    """Embed a list of texts, returning a (len(texts), dim) float32 matrix.
+
+    Duplicate texts are embedded once, cached vectors are reused and only the
+    misses are sent to the provider, provider.batch_size texts at a time.
+    """
+    provider = provider or get_provider()
+    texts = [normalize_text(text) for text in texts]
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    keys = [text_hash(text) for text in texts]
+    unique = dict(zip(keys, texts))
+    vectors = embedding_cache.get_many(provider.name, list(unique))
+
+    missing = [key for key in unique if key not in vectors]
+    if missing and provider.remote:
+        # all batches in flight at once (bounded and throttled); texts another caller is
+        # already embedding are awaited rather than requested twice
+        fetched = run_sync(embedding_client.load_many(
+            provider.name, {key: unique[key] for key in missing}, provider.embed, provider.batch_size
+        ))
+        embedding_cache.put_many(provider.name, fetched)
+        vectors.update(fetched)
+    else:
+        for start in range(0, len(missing), provider.batch_size):
+            batch = missing[start:start + provider.batch_size]
+            fetched = dict(zip(batch, provider.embed([unique[key] for key in batch])))
+            embedding_cache.put_many(provider.name, fetched)
+            vectors.update(fetched)
+
+    return np.vstack([np.asarray(vectors[key], dtype=np.float32) for key in keys])
+
+
+def embed_text(text, provider=None):
+    return embed_texts([text], provider)[0]
@@ -1,47 +1,35 @@
 import streamlit as st
-import fitz
-import pytesseract
-from PIL import Image
-import sqlite3
-import os
-import shutil
-import atexit
-import time
-import re
-import json
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from database_func import add_recruiter, validate_recruiter, recruiter_exists, get_job_descriptions, save_job_description, delete_all_job_descriptions, student_exists, add_student, validate_student, connect_db, extract_skills#, delete_job_description  # Import functions from the database module
-from chroma_db_func import index_database_data_for_student, index_database_data_for_recruiter, GeminiEmbeddingFunction
-import chromadb
-# from chromadb.utils import embedding_functions
-from chromadb.config import Settings
+from database_func import add_recruiter, validate_recruiter, recruiter_exists, get_job_descriptions, save_job_description, delete_all_job_descriptions, student_exists, add_student, validate_student, connect_db, get_student_features, submit_application, withdraw_application, fetch_job_features, get_job_skills, fetch_applicants, get_recruiter_email#, delete_job_description  # Import functions from the database module
+from chroma_db_func import index_database_data_for_student, index_database_data_for_recruiter, index_watermark, student_index_watermark, GeminiEmbeddingFunction, get_recruiter_collection, get_student_collection
+from ranking_func import score_candidates, is_compatible, HYBRID_WEIGHTS
+from shortlist_func import fetch_shortlist_page, SHORTLIST_PAGE_SIZE, SHORTLIST_SORTS
+from retrieval_func import retrieve_context
+from llm_func import start_chat, stream_reply
+from pdf_func import extract_pdf_text
+from blob_store_func import get_text
+from resources_func import get_skills_list
+from query_cache_func import query_cache
+from skill_index_func import fetch_job_index
+from profile_func import DEGREE_LEVELS, degree_name
+from ann_index_func import search_students
+from job_queue_func import enqueue_job, get_job, content_key, ensure_workers, PENDING_STATES
 
-settings = Settings(
-    persist_directory=r"./chroma_db"  
-)
 
-import google.generativeai as genai
-
-
-with open("extractor_library.json", "r") as file:
-    skills_data = json.load(file)
-
-skills_list = skills_data["skills_list"]
-
-
-
-genai.configure(api_key=os.environ['GEMINI_API_KEY'])
-def gemini_embedding(text):
-    
-    response = genai.embed_content(content=text, model="models/text-embedding-004")
-    return response['embedding']
+# the parsed library is cached per process, not redone on every rerun; Gemini is configured
+# only when a Gemini embedding provider or chat is created, so offline backends need no key
+skills_list = get_skills_list()
 
 
 
 st.set_page_config(page_title="SmartMatch", page_icon=":briefcase:", layout="wide")
 
+# background workers for resume processing, started once per server process; never from a
+# process that merely imports this script (e.g. as __mp_main__)
+if __name__ == "__main__":
+    ensure_workers()
+
 # Landing Page
 def landing_page():
     st.title(":briefcase: SmartMatch - Recruitment Assistant")
@@ -151,19 +139,12 @@ def recruiter_dashboard():
                     st.write(previous_descriptions[selected_title])  
                 with st.expander(f"**Required Skills: {selected_title}**", expanded=False):
                     
-                    conn = connect_db()
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT jd.skills FROM job_descriptions jd JOIN recruiters r ON jd.recruiter_id = r.recruiter_id WHERE r.recruiter_code = ? AND jd.title = ?",
-                        (recruiter_code, selected_title)
-                    )
-                    skills_result = cursor.fetchone()
+                    jd_skills_str = get_job_skills(recruiter_code, selected_title)
                 
-                    if skills_result and skills_result[0]:
-                        st.write(skills_result[0])
+                    if jd_skills_str:
+                        st.write(jd_skills_str)
                     else:
                         st.info("No skills found for this job description.")
-                    conn.close()
                     
 
 
@@ -192,10 +173,8 @@ def recruiter_dashboard():
 
         if job_title and job_description and st.button("Save Job Description", key="save_button"):
 
-            extracted_skills = extract_skills(job_description, skills_list)
-            
- 
-            if save_job_description(recruiter_code, job_title, job_description, uploaded_file, extracted_skills):
+            # skills and their embedding are extracted and stored by save_job_description
+            if save_job_description(recruiter_code, job_title, job_description, uploaded_file, skills_list):
                 st.success("Job description saved successfully!")
                 st.rerun()
             else:
@@ -213,24 +192,13 @@ def recruiter_dashboard():
 
         if selected_title:
          
-            conn = connect_db()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT s.student_code, s.name, rr.resume_text, rr.timestamp
-                FROM recruiter_resumes rr
-                JOIN students s ON rr.student_code = s.student_code
-                WHERE rr.jd_title = ? AND rr.recruiter_code = ?
-                """,
-                (selected_title, recruiter_code)
-            )
-            resumes = cursor.fetchall()
+            resumes = fetch_applicants(recruiter_code, selected_title)
 
             if resumes:
-                for student_code, name, resume_text, timestamp in resumes:
+                for student_code, name, _, resume_blob, timestamp in resumes:
                     with st.expander(f"**{name} (Student ID: {student_code})**"):
                         st.write(f"**Submitted on:** {timestamp}")
-                        st.write(f"**Resume:**\n{resume_text}")
+                        st.write(f"**Resume:**\n{get_text(resume_blob)}")
             else:
                 st.info("No resumes have been submitted for the selected job description.")
         else:
@@ -239,70 +207,101 @@ def recruiter_dashboard():
     with col3:
 
         st.subheader("Shortlist Candidates")
+        visible_rows = []
         st.write("Match candidates to specific job openings based on their relevant skills and resume scores.")
 
         if selected_title:
             st.write(f"**Job Description:** {selected_title}")
-            jd_text = previous_descriptions[selected_title]
 
-            conn = connect_db()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT s.student_code, s.name, rr.resume_text
-                FROM recruiter_resumes rr
-                JOIN students s ON rr.student_code = s.student_code
-                WHERE rr.jd_title = ? AND rr.recruiter_code = ?
-                """,
-                (selected_title, recruiter_code)
-            )
-            resumes = cursor.fetchall()
+            # jd_embedding = gemini_embedding(jd_text) 
+            jd_skills = fetch_job_features(recruiter_code, skills_list, title=selected_title)[0]["skills"]
 
-            if resumes:
-                
-                resume_data = [{"Student ID": r[0], "Name": r[1], "Resume": r[2]} for r in resumes]
-
-                
-                # jd_embedding = gemini_embedding(jd_text) 
-                jd_skills = extract_skills(jd_text, skills_list) 
-                jd_skills_text = ", ".join(jd_skills)
-                jd_embedding = gemini_embedding(jd_skills_text)
+            # filters run in SQL over the skill overlap, degree and experience stored with each application
+            min_skills = st.number_input(
+                "Minimum matching skills", min_value=0, max_value=max(len(jd_skills), 1), value=0, key="min_matching_skills"
+            )
+            min_degree = st.selectbox("Minimum degree", list(DEGREE_LEVELS), key="min_degree")
+            min_years = st.number_input("Minimum years of experience", min_value=0.0, value=0.0, step=0.5, key="min_experience_years")
+
+            ranking_mode = st.radio("Ranking mode", ["Skill embedding", "Hybrid (BM25 + embedding + skills)"], key="ranking_mode", horizontal=True)
+            hybrid = ranking_mode.startswith("Hybrid")
+            weights = None
+            if hybrid:
+                # full-text signal from a local BM25 index instead of full-text embeddings
+                with st.expander("Hybrid weights"):
+                    weights = (
+                        st.slider("BM25 over the resume text", 0.0, 1.0, HYBRID_WEIGHTS[0], 0.05, key="weight_bm25"),
+                        st.slider("Skill embedding", 0.0, 1.0, HYBRID_WEIGHTS[1], 0.05, key="weight_embedding"),
+                        st.slider("Skill overlap", 0.0, 1.0, HYBRID_WEIGHTS[2], 0.05, key="weight_skills"),
+                    )
+            sort_options = [sort for sort in SHORTLIST_SORTS if hybrid or sort != "Hybrid Score"]
+            sort = st.selectbox("Sort by", sort_options, index=sort_options.index("Hybrid Score" if hybrid else "Resume Score"), key=f"shortlist_sort_{hybrid}")
+
+            # only one page is fetched, scored and rendered per rerun
+            page = st.session_state.get("shortlist_page", 1)
+            visible_rows, total = fetch_shortlist_page(
+                recruiter_code, selected_title, skills_list, len(jd_skills), page - 1, SHORTLIST_PAGE_SIZE, sort,
+                min_skills, DEGREE_LEVELS[min_degree], min_years, weights,
+            )
+            pages = max(1, -(-total // SHORTLIST_PAGE_SIZE))
+            if page > pages:
+                st.session_state["shortlist_page"] = pages
+                st.rerun()
 
+            if total:
                 resume_scores = []
+                for r in visible_rows:
+                    similarity = r["resume_score"] or 0.0
+                    compatibility = '✅' if is_compatible(similarity) else '❌'
 
-                for r in resume_data:
-                    # resume_embedding = gemini_embedding(r["Resume"])
-                    # similarity = cosine_similarity([jd_embedding], [resume_embedding])[0][0] * 100
-
-
-                    resume_skills = extract_skills(r["Resume"], skills_list)
-                    resume_skills_text = ", ".join(resume_skills)
-                    resume_embedding = gemini_embedding(resume_skills_text)
-
-                    similarity = cosine_similarity([jd_embedding], [resume_embedding])[0][0]*100
-                    compatibility = '✅' if similarity >= 70 else '❌'
-
-                    matching_skills = ", ".join(set(jd_skills).intersection(resume_skills))
+                    resume_skills = set(r["skills"])
+                    matching_skills = ", ".join(skill for skill in jd_skills if skill in resume_skills)
 
                     resume_scores.append({
-                        "Student ID": r["Student ID"],
-                        "Name": r["Name"],
+                        "Student ID": r["student_code"],
+                        "Name": r["name"],
                         # "Resume": r["Resume"],
-                        "Resume Score": round(similarity, 2),
+                        "Resume Score": round(float(similarity), 2),
+                        "Hybrid Score": round(float(r["hybrid_score"]), 2),
                         "Compatibility": compatibility,
-                        "Matching Skills": matching_skills
+                        "Skill Overlap": f"{r['skill_overlap'] or 0}/{len(jd_skills)}",
+                        "Matching Skills": matching_skills,
+                        "Degree": degree_name(r["degree_level"]),
+                        "Experience (years)": r["experience_years"],
                     })
 
-
-                st.write("**Resumes with Resume Scores and Matching Skills:**")
-
+                st.write(f"**Resumes with Resume Scores and Matching Skills:** {total} applicants")
+                score_columns = ["Hybrid Score", "Resume Score"] if hybrid else ["Resume Score"]
                 resume_df = pd.DataFrame(resume_scores)
-                st.dataframe(resume_df[["Student ID", "Name", "Resume Score", "Compatibility", "Matching Skills"]].sort_values("Resume Score", ascending=False), use_container_width=True)
+                st.dataframe(resume_df[["Student ID", "Name", *score_columns, "Compatibility", "Skill Overlap", "Matching Skills", "Degree", "Experience (years)"]], use_container_width=True, hide_index=True)
+                st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="shortlist_page")
+            elif min_skills or DEGREE_LEVELS[min_degree] or min_years:
+                st.info("No applicant meets the minimum skills, degree and experience.")
             else:
                 st.info("No resumes submitted for the selected job description.")
+
+            # approximate nearest-neighbour search over every student's stored resume embedding
+            st.write("**Best candidates in the whole student base:**")
+            search_k = st.number_input("Number of candidates", min_value=1, max_value=500, value=50, key="ann_search_k")
+            if st.button("Search all students"):
+                jd_embedding = fetch_job_features(recruiter_code, skills_list, title=selected_title)[0]["embedding"]
+                matches = search_students(jd_embedding, k=int(search_k))
+                if matches:
+                    st.dataframe(pd.DataFrame([
+                        {
+                            "Student ID": m["student_code"], "Name": m["name"], "Email": m["email"],
+                            "Resume Score": round(m["score"], 2), "Compatibility": '✅' if is_compatible(m["score"]) else '❌',
+                        }
+                        for m in matches
+                    ]), use_container_width=True)
+                else:
+                    st.info("No student has uploaded a resume yet.")
         else:
             st.info("Select a job description to view the corresponding resumes.")
 
+        cache_stats = query_cache.stats()
+        st.caption(f"Query cache: {cache_stats['hit_ratio']:.0%} hits ({cache_stats['hits']} of {cache_stats['hits'] + cache_stats['misses']} lookups)")
+
 
     st.markdown("---")
 
@@ -314,31 +313,24 @@ def recruiter_dashboard():
 
         if selected_title:
             
-            cursor.execute(
-                """
-                SELECT s.student_code, s.name, s.email
-                FROM recruiter_resumes rr
-                JOIN students s ON rr.student_code = s.student_code
-                WHERE rr.jd_title = ? AND rr.recruiter_code = ?
-                """,
-                (selected_title, recruiter_code)
-            )
-            candidates = cursor.fetchall()
-            cursor.execute('SELECT email FROM recruiters WHERE recruiter_code = ?', (recruiter_code,))
-            recruiter_email = cursor.fetchone()[0]
-
-            if candidates:
-              
-                candidate_data = [{"Student ID": c[0], "Name": c[1], "Email": c[2]} for c in candidates]
-                candidate_df = pd.DataFrame(candidate_data)
-                candidate_df["Select"] = False
-
-                
-                for idx, row in candidate_df.iterrows():
-                    candidate_df.loc[idx, "Select"] = st.checkbox(f"Select {row['Name']}", key=f"candidate_{row['Student ID']}")
+            recruiter_email = get_recruiter_email(recruiter_code)
+
+            if visible_rows:
+                # checkboxes only for the shortlist page on screen; selections on other pages are kept per job description
+                selected = st.session_state.setdefault(f"selected_candidates_{selected_title}", {})
+                for r in visible_rows:
+                    checked = st.checkbox(
+                        f"Select {r['name']}", value=r["student_code"] in selected, key=f"candidate_{selected_title}_{r['student_code']}"
+                    )
+                    if checked:
+                        selected[r["student_code"]] = (r["name"], r["email"])
+                    else:
+                        selected.pop(r["student_code"], None)
 
-              
-                selected_candidates = candidate_df[candidate_df["Select"]]
+                selected_candidates = pd.DataFrame(
+                    [{"Student ID": code, "Name": name, "Email": email} for code, (name, email) in selected.items()],
+                    columns=["Student ID", "Name", "Email"],
+                )
                 if not selected_candidates.empty:
                     st.write("Selected Candidates:")
                     st.dataframe(selected_candidates[["Student ID", "Name", "Email"]], use_container_width=True)
@@ -394,27 +386,22 @@ def recruiter_dashboard():
         embedding_function = GeminiEmbeddingFunction()
 
         if recruiter_code:
-            global recruiter_client
-            recruiter_client = chromadb.PersistentClient(path="chroma_db_recruiter")
-            collection = recruiter_client.get_or_create_collection(
-                name=f"recruiter_{recruiter_code}",
-                embedding_function=embedding_function
-            )
+            # one shared client and collection handle per process, not reopened on every rerun
+            collection = get_recruiter_collection(recruiter_code, embedding_function)
 
            
-            collection_count = collection.count()
-            if collection_count == 0:
-                st.write("Indexing data for recruiter...")
-                index_database_data_for_recruiter(recruiter_code, collection)
-                collection_count = collection.count()
+            # the collection persists across logins; only re-sync when the recruiter's JDs or applications changed
+            watermark = index_watermark(recruiter_code)
+            if st.session_state.get("recruiter_index_watermark") != watermark:
+                with st.spinner("Syncing data for recruiter..."):
+                    index_database_data_for_recruiter(recruiter_code, collection)
+                st.session_state["recruiter_index_watermark"] = watermark
 
             if st.button("Send") and user_query:
                 
-                results = collection.query(query_texts=[user_query], n_results = collection_count)
-                # st.write(results)
-
-
-                context = "\n".join(results["documents"][0])
+                # top-k relevant chunks (MMR-diversified) within the prompt token budget
+                context, context_stats = retrieve_context(collection, embedding_function([user_query])[0])
+                st.caption(f"Context: {context_stats['chunks']} chunks, ~{context_stats['tokens']} tokens")
                 # st.write(context)
                 prompt = f"""
                 You are an assistant helping a recruiter with resumes submitted to him and his job postings. Below are the job descriptions and resumes:
@@ -426,33 +413,33 @@ def recruiter_dashboard():
                 Keep the responses consise and in bullet points wherever possible. If the query is out of context, 
                 like not any job related or resume related, then just answer out of your general knowledge. 
                 """
-                model = genai.GenerativeModel("models/gemini-1.5-flash-8b")
                 if "gemini_chat" not in st.session_state:
-                    st.session_state["gemini_chat"] = model.start_chat(history=[])
+                    st.session_state["gemini_chat"] = start_chat()
 
                 chat = st.session_state["gemini_chat"]
-                response = chat.send_message(prompt)
-
 
-                st.session_state["chat_history"].append({"user": user_query, "ai": response.text})
                 with st.container():
-                    for chat in st.session_state["chat_history"]:
-                        st.write(f"🧑‍🎓: {chat['user']}")
-                        st.write(f"🤖: {chat['ai']}")
+                    for past in st.session_state["chat_history"]:
+                        st.write(f"🧑‍🎓: {past['user']}")
+                        st.write(f"🤖: {past['ai']}")
                         st.markdown("---")
 
+                    # stream the new answer into the page as chunks arrive
+                    st.write(f"🧑‍🎓: {user_query}")
+                    st.write("🤖:")
+                    reply_stats = {}
+                    answer = st.write_stream(stream_reply(chat, prompt, reply_stats))
+                    st.caption(f"First token after {reply_stats['ttft']:.2f} s, full answer after {reply_stats['total']:.2f} s")
+                    st.markdown("---")
+
+                st.session_state["chat_history"].append({"user": user_query, "ai": answer})
+
     
     st.markdown("---")
   
     if st.button("Logout"):
-        if recruiter_code:
-            try:
-                recruiter_client.delete_collection(name=f"recruiter_{recruiter_code}")
-                print("Recruiter ChromaDB collection deleted successfully.")
-            except Exception as e:
-                st.error(f"Failed to delete ChromaDB collection: {e}")
-
         
+        st.session_state.pop("recruiter_index_watermark", None)
         st.session_state.pop("chat_history", None)
         st.session_state.pop("gemini_chat", None)
 
@@ -463,35 +450,23 @@ def recruiter_dashboard():
 
 
 
-# extract text from a PDF
+# extract text from a PDF; scanned pages without a text layer are OCR'd in parallel
 def extract_text_from_pdf(uploaded_file):
     try:
-        pdf_text = ""
-        with fitz.open(stream=uploaded_file.read(), filetype="pdf") as doc:
-            for page in doc:
-                pdf_text += page.get_text() 
-
-        # If no text was extracted, use OCR for images/scans
-        # if not pdf_text.strip():
-        #     pdf_text = ocr_pdf(uploaded_file)
-        return pdf_text
+        return extract_pdf_text(uploaded_file.getbuffer())
     except Exception as e:
         st.error("Error reading PDF file.")
         return None
 
-# # OCR function
-# def ocr_pdf(uploaded_file):
-#     pdf_images = []
-#     with fitz.open(stream=uploaded_file, filetype="pdf") as pdf:
-#         for page in pdf.pages:
-#             img = page.to_image()
-#             pdf_images.append(img)
-
-#     # Run OCR on each page image
-#     ocr_text = ""
-#     for img in pdf_images:
-#         ocr_text += pytesseract.image_to_string(img)
-#     return ocr_text
+# polls the background resume job until it finishes
+@st.fragment(run_every=1.0)
+def resume_job_status(job_id):
+    job = get_job(job_id)
+    if job and job["state"] in PENDING_STATES:
+        st.info(f"Processing your resume in the background ({job['state']}, attempt {max(job['attempts'], 1)})...")
+    else:
+        # full rerun so the page shows the stored resume text
+        st.rerun()
 
 # Student Page
 def student_dashboard():
@@ -535,6 +510,7 @@ def student_dashboard():
 
             else:
                 st.error("Recruiter email not found.")
+            conn.close()
         else:
             st.error("Invalid recruiter code.")
 
@@ -542,9 +518,10 @@ def student_dashboard():
 
     conn = connect_db()
     cursor = conn.cursor()
-    cursor.execute("SELECT pdf_location FROM students WHERE student_code = ?", (student_code,))
+    cursor.execute("SELECT resume_blob FROM students WHERE student_code = ?", (student_code,))
     result = cursor.fetchone()
-    previous_text = result[0] if result else None
+    conn.close()
+    previous_text = get_text(result[0]) if result else None
 
     col1, col2 = st.columns([2, 3])
     with col1:
@@ -556,41 +533,25 @@ def student_dashboard():
 
         uploaded_file = st.file_uploader("Upload your Resume (PDF only):", type=["pdf"])
 
-        if uploaded_file:
-            try:
-                
-                pdf_text = ""
-                with fitz.open(stream=uploaded_file.read(), filetype="pdf") as doc:
-                    for page in doc:
-                        pdf_text += page.get_text()
-
-                if pdf_text.strip():
-                  
-                    extracted_skills = []
-                    if skills_list:
-                        extracted_skills = extract_skills(pdf_text, skills_list)
-                    extracted_skills = list(set(extracted_skills))
-                    extracted_skills_str = ", ".join(extracted_skills)
-
-                    
-                    cursor.execute(
-                        "UPDATE students SET pdf_location = ? WHERE student_code = ?",
-                        (pdf_text, student_code),
-                    )
-                    conn.commit()
-
-                   
-                    st.markdown("### Extracted Resume Text")
-                    st.text_area("Extracted text from your uploaded resume:", value=pdf_text, height=200, disabled=True)
+        if uploaded_file and st.session_state.get("resume_upload_id") != uploaded_file.file_id:
+            # parsing, skill extraction and embedding run in a background worker; this returns right away
+            pdf_bytes = uploaded_file.getbuffer()
+            st.session_state["resume_upload_id"] = uploaded_file.file_id
+            st.session_state["resume_job_id"] = enqueue_job(
+                "process_resume", pdf_bytes, {"student_code": student_code},
+                dedupe_key=content_key(pdf_bytes, student_code), rerun_done=True,
+            )
 
-                    st.markdown("### Extracted Skills from Resume")
-                    st.write(extracted_skills_str)
-
-                    st.success("Resume text and skills successfully extracted and saved.")
-                else:
-                    st.error("The uploaded PDF is empty or unreadable.")
-            except Exception as e:
-                st.error(f"An error occurred while processing the PDF: {str(e)}")
+        if "resume_job_id" in st.session_state:
+            job = get_job(st.session_state["resume_job_id"])
+            if job and job["state"] in PENDING_STATES:
+                resume_job_status(job["id"])
+            elif job and job["state"] == "done":
+                st.markdown("### Extracted Skills from Resume")
+                st.write(", ".join(job["result"]["skills"]))
+                st.success("Resume text and skills successfully extracted and saved.")
+            elif job:
+                st.error(f"An error occurred while processing the PDF: {job['error'].splitlines()[0]}")
 
         if job_descriptions:
             st.subheader("Available Job Descriptions from Recruiter")
@@ -606,25 +567,9 @@ def student_dashboard():
             if st.button("Send Resume to Recruiter"):
                 if recruiter_code and previous_text and selected_jd_title:
                    
-                    cursor.execute(
-                        "SELECT COUNT(*) FROM recruiter_resumes WHERE recruiter_code = ? AND student_code = ? AND jd_title = ?",
-                        (recruiter_code, student_code, selected_jd_title),
-                    )
-                    record_exists = cursor.fetchone()[0]
-
-                    if record_exists:
+                    if not submit_application(recruiter_code, student_code, selected_jd_title):
                         st.warning("You have already sent your resume for this job description.")
                     else:
-                        
-                        cursor.execute(
-                            """
-                            INSERT INTO recruiter_resumes 
-                            (recruiter_code, student_code, resume_text, jd_title, extracted_resume_skills) 
-                            VALUES (?, ?, ?, ?, ?)
-                            """,
-                            (recruiter_code, student_code, previous_text, selected_jd_title, extracted_skills_str),
-                        )
-                        conn.commit()
                         st.success("Your resume and extracted skills have been sent to the recruiter for the selected job description.")
                 else:
                     st.error("Please upload a resume, connect with a recruiter, and select a job description before sending.")
@@ -633,19 +578,7 @@ def student_dashboard():
             if st.button("Withdraw Application"):
                 if recruiter_code and selected_jd_title:
                    
-                    cursor.execute(
-                        "SELECT COUNT(*) FROM recruiter_resumes WHERE recruiter_code = ? AND student_code = ? AND jd_title = ?",
-                        (recruiter_code, student_code, selected_jd_title),
-                    )
-                    record_exists = cursor.fetchone()[0]
-
-                    if record_exists:
-                       
-                        cursor.execute(
-                            "DELETE FROM recruiter_resumes WHERE recruiter_code = ? AND student_code = ? AND jd_title = ?",
-                            (recruiter_code, student_code, selected_jd_title),
-                        )
-                        conn.commit()
+                    if withdraw_application(recruiter_code, student_code, selected_jd_title):
                         st.success("Your application for the selected job description has been withdrawn.")
                     else:
                         st.warning("No application found to withdraw for the selected job description.")
@@ -663,53 +596,44 @@ def student_dashboard():
             
             if recruiter_exists(recruiter_code):
                
-                conn = connect_db()
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT title, skills 
-                    FROM job_descriptions 
-                    JOIN recruiters ON job_descriptions.recruiter_id = recruiters.recruiter_id 
-                    WHERE recruiters.recruiter_code = ?
-                """, (recruiter_code,))
-                job_descriptions = cursor.fetchall()
+                job_features, job_index = fetch_job_index(recruiter_code, skills_list)
 
                 
                 student_code = st.session_state.get("student_code")
-                cursor.execute("SELECT pdf_location FROM students WHERE student_code = ?", (student_code,))
-                result = cursor.fetchone()
-                conn.close()
+                student_features = get_student_features(student_code, skills_list)
 
-                if not result or not result[0]:
+                if not student_features:
                     st.error("No resume uploaded. Please upload your resume first.")
                 else:
                     
-                    resume_text = result[0]
-                    student_skills = extract_skills(resume_text, skills_list)
+                    _, student_skills, student_embedding = student_features
 
                     if not student_skills:
                         st.warning("No skills could be extracted from your resume.")
                     else:
                        
                         compatibility_data = []
-                        student_embedding = gemini_embedding(", ".join(student_skills)) 
-                        for jd_title, jd_skills in job_descriptions:
-                            jd_skills_list = jd_skills.split(", ") if jd_skills else []
-                            jd_embedding = gemini_embedding(", ".join(jd_skills_list)) 
+                        similarities = score_candidates(student_embedding, [jd["embedding"] for jd in job_features]) if job_features else []
+                        # share of each JD's required skills the student has, for all JDs at once
+                        common_counts = job_index.overlap_counts(student_skills)
+                        compatibility_scores = np.round(
+                            common_counts / np.maximum(job_index.skill_counts, 1) * 100, 2
+                        )
+                        for position, (jd, similarity) in enumerate(zip(job_features, similarities)):
+                            jd_title, jd_skills_list = jd["title"], jd["skills"]
 
-                            common_skills = set(student_skills).intersection(set(jd_skills_list))
-                            compatibility_score = round(len(common_skills) / len(jd_skills_list) * 100, 2) if jd_skills_list else 0
+                            common_skills = job_index.shared_skills(position, student_skills)
+                            compatibility_score = compatibility_scores[position]
                             abs_compatibility = '✅' if compatibility_score >= 10 else '❌'
 
-                            similarity = cosine_similarity([student_embedding], [jd_embedding])[0][0] * 100
 
-                        
                             compatibility_data.append({
                                 "Job Title": jd_title,
                                 "Required Skills": ", ".join(jd_skills_list),
                                 # "Your Skills": ", ".join(student_skills),
                                 "Common Skills": ", ".join(common_skills),
                                 "Compatibility": abs_compatibility,
-                                "Resume Score": round(similarity, 2)
+                                "Resume Score": round(float(similarity), 2)
                             })
                         st.write('**Your Skills:**')
                         st.write(', '.join(student_skills))
@@ -726,8 +650,6 @@ def student_dashboard():
             st.info("Please enter a recruiter code to proceed.")
 
 
-    conn.close()
-
     st.markdown("---")
     col1, col2 = st.columns([2, 3])
 
@@ -762,26 +684,19 @@ def student_dashboard():
         embedding_function = GeminiEmbeddingFunction()
 
         if recruiter_code:
-            global client
-            client = chromadb.PersistentClient(path="chroma_db")
-            collection = client.get_or_create_collection(
-                name=f"recruiter_{recruiter_code}",
-                embedding_function=embedding_function
-            )
+            collection = get_student_collection(student_code, recruiter_code, embedding_function)
 
-            collection_count = collection.count()
-            if collection_count == 0:
-                st.write("Indexing data for candidate...")
-                index_database_data_for_student(recruiter_code, student_code, collection)
-                collection_count = collection.count()
+            watermark = student_index_watermark(recruiter_code, student_code)
+            if st.session_state.get("student_index_watermark") != watermark:
+                with st.spinner("Syncing data for candidate..."):
+                    index_database_data_for_student(recruiter_code, student_code, collection)
+                st.session_state["student_index_watermark"] = watermark
                 
                 
             if st.button("Send") and user_query:
             
-                results = collection.query(query_texts=[user_query], n_results = collection_count)
-
-
-                context = "\n".join(results["documents"][0])
+                context, context_stats = retrieve_context(collection, embedding_function([user_query])[0])
+                st.caption(f"Context: {context_stats['chunks']} chunks, ~{context_stats['tokens']} tokens")
                 # st.write(context)
                 prompt = f"""
                 You are an assistant helping a student with job applications. Below are the job descriptions and resumes:
@@ -792,35 +707,33 @@ def student_dashboard():
                 Answer as a helpful assistant. Keep the responses consise. If the query is out of context, 
                 like not any job related or resume related, then just answer out of your general knowledge.
                 """
-                model = genai.GenerativeModel("models/gemini-1.5-flash-8b")
                 if "gemini_chat" not in st.session_state:
-                    st.session_state["gemini_chat"] = model.start_chat(history=[])
+                    st.session_state["gemini_chat"] = start_chat()
 
                 chat = st.session_state["gemini_chat"]
-                response = chat.send_message(prompt)
-
 
-                st.session_state["chat_history"].append({"user": user_query, "ai": response.text})
                 with st.container():
-                    for chat in st.session_state["chat_history"]:
-                        st.write(f"🧑‍🎓: {chat['user']}")
-                        st.write(f"🤖: {chat['ai']}")
+                    for past in st.session_state["chat_history"]:
+                        st.write(f"🧑‍🎓: {past['user']}")
+                        st.write(f"🤖: {past['ai']}")
                         st.markdown("---")
 
+                    # stream the new answer into the page as chunks arrive
+                    st.write(f"🧑‍🎓: {user_query}")
+                    st.write("🤖:")
+                    reply_stats = {}
+                    answer = st.write_stream(stream_reply(chat, prompt, reply_stats))
+                    st.caption(f"First token after {reply_stats['ttft']:.2f} s, full answer after {reply_stats['total']:.2f} s")
+                    st.markdown("---")
+
+                st.session_state["chat_history"].append({"user": user_query, "ai": answer})
+
             
   
     st.markdown('---')
     if st.button("Back to Home"):
        
-        if recruiter_code:
-            try:
-                client.delete_collection(name=f"recruiter_{recruiter_code}")
-                print("Candidate ChromaDB collection deleted successfully.")
-                client.close()
-            except Exception as e:
-                st.error(f"Failed to delete ChromaDB collection: {e}")
-
-       
+        st.session_state.pop("student_index_watermark", None)
         st.session_state.pop("chat_history", None)
         st.session_state.pop("gemini_chat", None)
 
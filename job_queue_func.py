@@ -0,0 +1,257 @@
+import argparse
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from database_func import connect_db, get_resume_hash, get_student_features, save_student_resume
+from pdf_func import extract_pdf_text, file_hash
+from resources_func import get_skills_list
+
+
+POLL_INTERVAL = 0.5     # seconds an idle worker waits before looking for work again
+LEASE_SECONDS = 300     # a running job whose worker went silent this long is handed out again
+RETRY_BACKOFF = 2.0     # seconds before the first retry, doubled on every further attempt
+MAX_ATTEMPTS = 3
+WORKER_COUNT = int(os.environ.get("SMARTMATCH_WORKERS", "2"))
+
+PENDING_STATES = ("queued", "running")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. an unreadable file)."""
+
+
+def process_resume(data, params):
+    """PDF bytes -> text -> skills and embedding, stored on the student's row."""
+    student_code = params["student_code"]
+    digest = file_hash(data)
+    if get_resume_hash(student_code) == digest:
+        # same file as the stored resume: nothing to extract
+        resume_text, skills, _ = get_student_features(student_code, get_skills_list())
+        return {"skills": skills, "chars": len(resume_text)}
+
+    pdf_text = extract_pdf_text(data)
+    if not pdf_text.strip():
+        raise PermanentJobError("The uploaded PDF is empty or unreadable.")
+    skills = save_student_resume(student_code, pdf_text, get_skills_list(), resume_hash=digest)
+    return {"skills": skills, "chars": len(pdf_text)}
+
+
+HANDLERS = {
+    "process_resume": process_resume,
+}
+
+
+def content_key(data, *scope):
+    """Dedupe key: hash of the job's input plus whatever scopes it (e.g. the student it belongs to)."""
+    digest = hashlib.sha256(data or b"").hexdigest()
+    return ":".join([digest, *map(str, scope)])
+
+
+def enqueue_job(kind, data=None, params=None, dedupe_key=None, max_attempts=MAX_ATTEMPTS, rerun_done=False):
+    """Queue a job and return its id.
+
+    A job with the same kind and dedupe_key is not queued twice: the existing
+    job's id is returned. A failed one is queued again, and so is a finished
+    one when rerun_done is set.
+    """
+    dedupe_key = dedupe_key or content_key(data, json.dumps(params or {}, sort_keys=True))
+    conn = connect_db()
+    c = conn.cursor()
+    try:
+        c.execute(
+            "INSERT OR IGNORE INTO jobs (kind, dedupe_key, params, data, max_attempts) VALUES (?, ?, ?, ?, ?)",
+            (kind, dedupe_key, json.dumps(params or {}), data, max_attempts),
+        )
+        c.execute("SELECT id, state FROM jobs WHERE kind = ? AND dedupe_key = ?", (kind, dedupe_key))
+        job_id, state = c.fetchone()
+        if state == "failed" or (rerun_done and state == "done"):
+            c.execute(
+                """
+                UPDATE jobs SET state = 'queued', attempts = 0, run_after = 0, error = NULL, data = ?,
+                updated_at = CURRENT_TIMESTAMP WHERE id = ?
+                """,
+                (data, job_id),
+            )
+        conn.commit()
+        return job_id
+    finally:
+        conn.close()
+
+
+def get_job(job_id):
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute("SELECT id, kind, state, attempts, result, error, updated_at FROM jobs WHERE id = ?", (job_id,))
+    row = c.fetchone()
+    conn.close()
+    if not row:
+        return None
+    return {
+        "id": row[0],
+        "kind": row[1],
+        "state": row[2],
+        "attempts": row[3],
+        "result": json.loads(row[4]) if row[4] else None,
+        "error": row[5],
+        "updated_at": row[6],
+    }
+
+
+def claim_job():
+    """Atomically take the oldest runnable job (or one whose lease expired); None if there is nothing to do."""
+    now = time.time()
+    conn = connect_db()
+    try:
+        # BEGIN IMMEDIATE so two workers can never claim the same job
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT id, kind, params, data FROM jobs
+            WHERE (state = 'queued' AND run_after <= ?) OR (state = 'running' AND lease_expires < ?)
+            ORDER BY id LIMIT 1
+            """,
+            (now, now),
+        ).fetchone()
+        if row:
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_expires = ?,
+                updated_at = CURRENT_TIMESTAMP WHERE id = ?
+                """,
+                (now + LEASE_SECONDS, row[0]),
+            )
+        conn.commit()
+        return row
+    finally:
+        conn.close()
+
+
+def complete_job(job_id, result):
+    conn = connect_db()
+    conn.execute(
+        """
+        UPDATE jobs SET state = 'done', result = ?, error = NULL, data = NULL, lease_expires = NULL,
+        updated_at = CURRENT_TIMESTAMP WHERE id = ?
+        """,
+        (json.dumps(result), job_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+def fail_job(job_id, error, retry=True):
+    """Queue the job again with exponential backoff, or mark it failed once it is out of attempts."""
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,))
+    attempts, max_attempts = c.fetchone()
+    if retry and attempts < max_attempts:
+        c.execute(
+            """
+            UPDATE jobs SET state = 'queued', error = ?, run_after = ?, lease_expires = NULL,
+            updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            """,
+            (error, time.time() + RETRY_BACKOFF * 2 ** (attempts - 1), job_id),
+        )
+    else:
+        c.execute(
+            "UPDATE jobs SET state = 'failed', error = ?, lease_expires = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (error, job_id),
+        )
+    conn.commit()
+    conn.close()
+
+
+def run_job(job):
+    job_id, kind, params, data = job
+    try:
+        result = HANDLERS[kind](data, json.loads(params))
+    except PermanentJobError as e:
+        fail_job(job_id, str(e), retry=False)
+        return False
+    except Exception as e:
+        fail_job(job_id, f"{e}\n{traceback.format_exc()}")
+        return False
+    complete_job(job_id, result)
+    return True
+
+
+def run_worker(poll_interval=POLL_INTERVAL, stop_event=None):
+    """Worker loop: claim and run jobs until stop_event is set."""
+    while stop_event is None or not stop_event.is_set():
+        job = claim_job()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+
+
+# Workers started by ensure_workers are `python job_queue_func.py` processes rather than multiprocessing
+# children: a spawned child would re-import the Streamlit script (its __main__) and fail while bootstrapping.
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def ensure_workers(count=WORKER_COUNT):
+    """Start the worker processes once per server process (restarting any that exited).
+
+    Does nothing in a child process. Workers exit when the process that started them does.
+    """
+    if multiprocessing.parent_process() is not None:
+        return []
+    with _workers_lock:
+        _workers[:] = [worker for worker in _workers if worker.poll() is None]
+        while len(_workers) < count:
+            _workers.append(subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--workers", "1", "--parent", str(os.getpid())]
+            ))
+        return list(_workers)
+
+
+def stop_workers():
+    with _workers_lock:
+        for worker in _workers:
+            worker.terminate()
+        for worker in _workers:
+            worker.wait()
+        _workers.clear()
+
+
+atexit.register(stop_workers)
+
+
+def _watch_parent(parent_pid, stop_event, interval=1.0):
+    # the starting process is gone when this process is re-parented
+    while not stop_event.wait(interval):
+        if os.getppid() != parent_pid:
+            stop_event.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run SmartMatch background job workers.")
+    parser.add_argument("--workers", type=int, default=WORKER_COUNT)
+    parser.add_argument("--parent", type=int, help="exit when the process with this pid exits (used by ensure_workers)")
+    args = parser.parse_args()
+    stop_event = threading.Event()
+    if args.parent:
+        threading.Thread(target=_watch_parent, args=(args.parent, stop_event), daemon=True).start()
+    if args.workers <= 1:
+        run_worker(stop_event=stop_event)
+    else:
+        # spawned children re-import this module, not the Streamlit script
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=run_worker, daemon=True, name=f"smartmatch-worker-{n}") for n in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,84 @@
+import os
+import re
+import time
+
+import google.generativeai as genai
+
+from async_client_func import llm_client, run_sync
+from resources_func import configure_genai
+
+
+CHAT_MODEL = "models/gemini-1.5-flash-8b"
+# "gemini" (default) or "fake" for an offline backend that streams a canned answer
+LLM_BACKEND = os.environ.get("SMARTMATCH_LLM_BACKEND", "gemini")
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeResponse:
+    def __init__(self, chunks, delay):
+        self._chunks = chunks
+        self._delay = delay
+        self.text = "".join(chunks)
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            time.sleep(self._delay)
+            yield FakeChunk(chunk)
+
+    def resolve(self):
+        pass
+
+
+class FakeChat:
+    """Offline stand-in for a Gemini ChatSession; streams a canned answer word by word."""
+
+    def __init__(self, delay=0.02, first_token_delay=0.3):
+        self.delay = delay
+        self.first_token_delay = first_token_delay
+        self.history = []
+
+    def send_message(self, prompt, stream=False):
+        question = re.search(r"Question:\s*(.*)", prompt)
+        question = question.group(1).strip() if question else prompt.strip()[:200]
+        answer = f"(offline answer) You asked: {question}. This reply comes from the fake LLM backend."
+        chunks = re.findall(r"\S+\s*", answer)
+        time.sleep(self.first_token_delay if stream else self.first_token_delay + self.delay * len(chunks))
+        self.history.append({"user": prompt, "ai": answer})
+        return FakeResponse(chunks, self.delay if stream else 0)
+
+
+def start_chat(backend=None):
+    backend = backend or LLM_BACKEND
+    if backend == "fake":
+        return FakeChat()
+    configure_genai()
+    return genai.GenerativeModel(CHAT_MODEL).start_chat(history=[])
+
+
+def stream_reply(chat, prompt, stats=None):
+    """Yield the answer text chunk by chunk as it arrives.
+
+    If a stats dict is given it is filled with "ttft" (seconds to the first
+    chunk), "total" (seconds to the last chunk) and "chunks".
+    """
+    start = time.perf_counter()
+    # throttled and retried on 429s through the shared LLM client
+    response = run_sync(llm_client.call(chat.send_message, prompt, stream=True))
+    chunks = 0
+    for chunk in response:
+        if not chunk.text:
+            continue
+        if chunks == 0 and stats is not None:
+            stats["ttft"] = time.perf_counter() - start
+        chunks += 1
+        yield chunk.text
+    # completes the chat history entry of a streamed Gemini response
+    response.resolve()
+    if stats is not None:
+        stats.setdefault("ttft", time.perf_counter() - start)
+        stats["total"] = time.perf_counter() - start
+        stats["chunks"] = chunks
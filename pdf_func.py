@@ -0,0 +1,177 @@
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+
+from database_func import connect_db
+
+
+OCR_DPI = int(os.environ.get("SMARTMATCH_OCR_DPI", "300"))
+OCR_WORKERS = int(os.environ.get("SMARTMATCH_OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_BATCH_PAGES = max(4, 2 * OCR_WORKERS)  # scanned pages rendered ahead and OCR'd together
+
+_ocr_pool = None
+
+
+def _ocr_image(png_bytes):
+    # runs in an OCR thread, each call a tesseract subprocess; imported here so the app works without tesseract installed
+    import pytesseract
+    from PIL import Image
+
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(Image.open(io.BytesIO(png_bytes)))
+    return text, time.perf_counter() - start
+
+
+def _get_ocr_pool():
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="smartmatch-ocr")
+    return _ocr_pool
+
+
+def _reset_ocr_pool():
+    # the next OCR call starts a fresh pool (e.g. with a new OCR_WORKERS)
+    global _ocr_pool
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(wait=False, cancel_futures=True)
+    _ocr_pool = None
+
+
+def _cached_ocr(page_hashes):
+    if not page_hashes:
+        return {}
+    conn = connect_db()
+    c = conn.cursor()
+    placeholders = ", ".join("?" * len(page_hashes))
+    c.execute(f"SELECT page_hash, text FROM ocr_cache WHERE page_hash IN ({placeholders})", page_hashes)
+    cached = dict(c.fetchall())
+    conn.close()
+    return cached
+
+
+def _store_ocr(texts):
+    conn = connect_db()
+    conn.executemany("INSERT OR REPLACE INTO ocr_cache (page_hash, text) VALUES (?, ?)", texts.items())
+    conn.commit()
+    conn.close()
+
+
+def ocr_pages(images, parallel=True):
+    """OCR rendered pages ({page number: png bytes}) -> ({page number: text}, {page number: (method, seconds)}).
+
+    Pages seen before are served from ocr_cache; the rest are OCR'd by a thread
+    pool. pytesseract runs one tesseract subprocess per page, so this also works
+    inside the daemonic job workers, which may not start multiprocessing children.
+    """
+    hashes = {number: hashlib.sha256(png).hexdigest() for number, png in images.items()}
+    cached = _cached_ocr(list(set(hashes.values())))
+    texts, timings = {}, {}
+    for number, page_hash in hashes.items():
+        if page_hash in cached:
+            texts[number] = cached[page_hash]
+            timings[number] = ("ocr-cache", 0.0)
+
+    todo = [number for number in images if number not in texts]
+    if todo:
+        if parallel and OCR_WORKERS > 1 and len(todo) > 1:
+            results = list(_get_ocr_pool().map(_ocr_image, [images[number] for number in todo]))
+        else:
+            results = map(_ocr_image, [images[number] for number in todo])
+        for number, (text, seconds) in zip(todo, results):
+            texts[number] = text
+            timings[number] = ("ocr", seconds)
+        _store_ocr({hashes[number]: texts[number] for number in todo})
+    return texts, timings
+
+
+def file_hash(source):
+    """sha256 of an in-memory PDF or of a file on disk (read through mmap, not into memory)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return hashlib.sha256(b"").hexdigest()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+    return hashlib.sha256(source).hexdigest()
+
+
+@contextlib.contextmanager
+def open_pdf(source, use_mmap=False):
+    """Open a PDF given as bytes / memoryview or as a path.
+
+    MuPDF reads a path from disk as pages are needed; with use_mmap the file is
+    memory-mapped and handed over as a buffer instead.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        with fitz.open(stream=source, filetype="pdf") as doc:
+            yield doc
+    elif not use_mmap:
+        with fitz.open(source, filetype="pdf") as doc:
+            yield doc
+    else:
+        with open(source, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                with fitz.open(stream=view, filetype="pdf") as doc:
+                    yield doc
+            finally:
+                # the map cannot close while a view of it is alive
+                view.release()
+
+
+def iter_pdf_pages(source, ocr=True, dpi=OCR_DPI, stats=None, use_mmap=False):
+    """Yield the text of each page of a PDF, in order.
+
+    Pages without a text layer are rendered at `dpi` and OCR'd; runs of such
+    pages are OCR'd together (up to OCR_BATCH_PAGES) so the pool stays busy
+    while only that many page images are held at a time. If a stats list is
+    given, one {"page", "method", "seconds"} entry per page is appended
+    (method is "text", "ocr", "ocr-cache", or "ocr-unavailable" when pytesseract
+    or the tesseract binary is missing and the page's empty text layer is kept).
+    """
+    pending, render_seconds = {}, {}
+    ocr_available = True
+
+    def flush():
+        nonlocal ocr_available
+        texts, timings = {number: "" for number in pending}, {}
+        if ocr_available:
+            try:
+                texts, timings = ocr_pages(pending)
+            except (ImportError, OSError):
+                # pytesseract / tesseract missing: keep the (empty) text layer for the rest of the document
+                ocr_available = False
+        for number in sorted(pending):
+            method, seconds = timings.get(number, ("ocr-unavailable", 0.0))
+            if stats is not None:
+                stats.append({"page": number, "method": method, "seconds": render_seconds[number] + seconds})
+            yield texts[number]
+        pending.clear()
+        render_seconds.clear()
+
+    with open_pdf(source, use_mmap) as doc:
+        for number, page in enumerate(doc):
+            start = time.perf_counter()
+            text = page.get_text()
+            if text.strip() or not ocr:
+                yield from flush()
+                if stats is not None:
+                    stats.append({"page": number, "method": "text", "seconds": time.perf_counter() - start})
+                yield text
+            else:
+                pending[number] = page.get_pixmap(dpi=dpi).tobytes("png")
+                render_seconds[number] = time.perf_counter() - start
+                if len(pending) >= OCR_BATCH_PAGES:
+                    yield from flush()
+        yield from flush()
+
+
+def extract_pdf_text(source, ocr=True, dpi=OCR_DPI, stats=None, use_mmap=False):
+    """Text of a PDF given as bytes / memoryview or as a path, pages joined once."""
+    return "".join(iter_pdf_pages(source, ocr=ocr, dpi=dpi, stats=stats, use_mmap=use_mmap))
@@ -0,0 +1,139 @@
+import json
+import re
+from functools import lru_cache
+
+from extractor_func import get_matcher
+from resources_func import get_education_keywords, get_library_resource, get_skills_list
+
+
+# resume headings that start a section when they sit on a line of their own (optionally followed by ":")
+SECTION_HEADINGS = (
+    "Education", "Academic Background", "Experience", "Work Experience", "Professional Experience",
+    "Internships", "Internship", "Projects", "Project", "Technical Skills", "Skills", "Certifications",
+    "Certification", "Achievements", "Awards", "Publications", "Extracurriculars", "Extracurricular",
+    "Summary", "Objective", "Profile", "Positions of Responsibility",
+)
+EXPERIENCE_UNITS = ("years", "year", "yrs", "yr")
+
+# highest degree found, as a level the shortlist can filter on ("at least a Bachelor")
+DEGREE_LEVELS = {"None": 0, "Certificate": 1, "Diploma": 2, "Bachelor": 3, "Master": 4, "PhD": 5}
+_DEGREE_PREFIXES = (
+    ("Bachelor", 3), ("B.Tech", 3), ("BSc", 3),
+    ("Master", 4), ("M.Tech", 4), ("MSc", 4),
+    ("PhD", 5), ("Diploma", 2), ("Certificate", 1), ("Certification", 1),
+)
+
+_NUMBER_BEFORE = re.compile(r"(?<![\d.])(\d{1,2}(?:\.\d)?)\s*\+?\s*$")
+_EXPERIENCE_AFTER = re.compile(r"\s*(?:of\s+)?(?:[a-z-]+\s+){0,2}?experience", re.IGNORECASE)
+_EXPERIENCE_BEFORE = re.compile(r"experience\W+(?:of\s+)?(?:over\s+|about\s+|around\s+)?$", re.IGNORECASE)
+MAX_EXPERIENCE_YEARS = 50
+
+
+class ResumeScanner:
+    """One KeywordMatcher over skills, education keywords, section headings and experience units.
+
+    A resume is walked once; every field of its profile comes out of the same list of matches.
+    """
+
+    def __init__(self, skills_list, education_keywords):
+        self.skills_list = tuple(skills_list)
+        self.education_keywords = tuple(education_keywords)
+        keywords = self.skills_list + self.education_keywords + SECTION_HEADINGS + EXPERIENCE_UNITS
+        self.matcher = get_matcher(keywords)
+        self.education_start = len(self.skills_list)
+        self.headings_start = self.education_start + len(self.education_keywords)
+        self.units_start = self.headings_start + len(SECTION_HEADINGS)
+        # "Education" is a field of study and a heading; as a heading line it is not the former
+        headings = {heading.lower() for heading in SECTION_HEADINGS}
+        self.heading_like = {i for i, keyword in enumerate(self.education_keywords) if keyword.lower() in headings}
+        self.degree_levels = {
+            i: max((level for prefix, level in _DEGREE_PREFIXES if keyword.startswith(prefix)), default=0)
+            for i, keyword in enumerate(self.education_keywords)
+        }
+
+    def skills(self, text):
+        """Just the skills, in library order (job descriptions)."""
+        found = self.matcher.find_indices(text)
+        return [skill for i, skill in enumerate(self.skills_list) if i in found]
+
+    def scan(self, text):
+        """{"skills", "education", "degree_level", "experience_years", "sections"} of a resume.
+
+        skills and education keep library order; sections are (heading, offset) pairs in text order;
+        experience_years is the largest stated "N years of experience", or None.
+        """
+        text = text or ""
+        skills, education, sections, years = set(), set(), [], []
+        for start, end, index in self.matcher.find_spans(text):
+            if index < self.education_start:
+                skills.add(index)
+            elif index < self.headings_start:
+                index -= self.education_start
+                if index not in self.heading_like or not _is_heading_line(text, start, end):
+                    education.add(index)
+            elif index < self.units_start:
+                if _is_heading_line(text, start, end):
+                    sections.append((SECTION_HEADINGS[index - self.headings_start], start))
+            else:
+                stated = _stated_years(text, start, end)
+                if stated is not None:
+                    years.append(stated)
+
+        return {
+            "skills": [self.skills_list[i] for i in sorted(skills)],
+            "education": [self.education_keywords[i] for i in sorted(education)],
+            "degree_level": max((self.degree_levels[i] for i in education), default=0),
+            "experience_years": max(years) if years else None,
+            "sections": sections,
+        }
+
+
+def _is_heading_line(text, start, end):
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    line_end = len(text) if line_end == -1 else line_end
+    return not text[line_start:start].strip() and text[end:line_end].strip() in ("", ":")
+
+
+def _stated_years(text, start, end):
+    number = _NUMBER_BEFORE.search(text, max(0, start - 8), start)
+    if number is None:
+        return None
+    if not (_EXPERIENCE_AFTER.match(text, end, end + 40) or _EXPERIENCE_BEFORE.search(text, max(0, number.start() - 30), number.start())):
+        return None
+    years = float(number.group(1))
+    return years if years <= MAX_EXPERIENCE_YEARS else None
+
+
+@lru_cache(maxsize=8)
+def _build(skills_list, education_keywords):
+    return ResumeScanner(skills_list, education_keywords)
+
+
+def get_scanner(skills_list, education_keywords=None):
+    """ResumeScanner for a library, built once per distinct (skills, education keywords).
+
+    education_keywords defaults to the extractor library's. The extractor library's own
+    scanner is cached in the resource layer, so it is rebuilt when the library file changes.
+    """
+    if education_keywords is None:
+        if tuple(skills_list) == get_skills_list():
+            return get_library_resource(
+                "resume_scanner", lambda library: ResumeScanner(library["skills_list"], library["education_keywords"])
+            )
+        education_keywords = get_education_keywords()
+    return _build(tuple(skills_list), tuple(education_keywords))
+
+
+def profile_columns(profile):
+    """(education, degree_level, experience_years, resume_sections) as stored in students / recruiter_resumes."""
+    return (
+        ", ".join(profile["education"]),
+        profile["degree_level"],
+        profile["experience_years"],
+        json.dumps(profile["sections"]),
+    )
+
+
+def degree_name(level):
+    return next((name for name, value in DEGREE_LEVELS.items() if value == level), "None")
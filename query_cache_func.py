@@ -0,0 +1,105 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+QUERY_CACHE_TTL = float(os.environ.get("SMARTMATCH_QUERY_CACHE_TTL", "60"))  # seconds
+QUERY_CACHE_MAX_ENTRIES = 2048
+
+
+class QueryCache:
+    """Process-wide cache of dashboard query results, shared by all Streamlit sessions.
+
+    Entries are scoped by (recruiter_code, jd_title); jd_title is None for
+    queries over all of a recruiter's job descriptions. Write paths call
+    invalidate() so results never outlive a change made through this process;
+    the TTL bounds staleness from writes made elsewhere (job workers, the bulk
+    importer). Cached results are shared: callers must not modify them.
+    """
+
+    def __init__(self, ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (recruiter_code, jd_title, key) -> (expires, value)
+
+    def get_or_load(self, recruiter_code, jd_title, key, load):
+        entry_key = (recruiter_code, jd_title, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self.invalidations
+
+        value = load()
+        with self._lock:
+            # an invalidation while we were loading may mean the value is already stale
+            if generation == self.invalidations:
+                self._entries[entry_key] = (now + self.ttl, value)
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, recruiter_code, jd_title=None):
+        """Drop a recruiter's cached results: all of them, or those of one job description plus the recruiter-wide ones."""
+        with self._lock:
+            self.invalidations += 1
+            for entry_key in list(self._entries):
+                if entry_key[0] == recruiter_code and (jd_title is None or entry_key[1] in (jd_title, None)):
+                    del self._entries[entry_key]
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+        }
+
+    def cached(self, jd_param=None):
+        """Decorator caching a query function whose first argument is recruiter_code.
+
+        jd_param names the argument holding the job description title, if any.
+        The remaining arguments become part of the key.
+        """
+
+        def decorator(fn):
+            signature = inspect.signature(fn)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = dict(bound.arguments)
+                recruiter_code = arguments.pop("recruiter_code")
+                jd_title = arguments.pop(jd_param) if jd_param else None
+                key = (fn.__name__,) + tuple(
+                    tuple(value) if isinstance(value, list) else value for value in arguments.values()
+                )
+                return self.get_or_load(recruiter_code, jd_title, key, lambda: fn(*args, **kwargs))
+
+            wrapper.uncached = fn
+            return wrapper
+
+        return decorator
+
+
+query_cache = QueryCache()
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+
+
+COMPATIBILITY_THRESHOLD = 70  # resume score (cosine * 100) needed to be marked compatible
+
+
+def _parse_weights(value, name="SMARTMATCH_HYBRID_WEIGHTS"):
+    """(bm25, embedding, skills) weights from a "0.4,0.4,0.2" string."""
+    try:
+        weights = tuple(float(w) for w in value.split(","))
+    except ValueError:
+        raise ValueError(f"{name} must be three comma-separated numbers, got {value!r}") from None
+    if len(weights) != 3:
+        raise ValueError(f"{name} must be three comma-separated numbers (BM25, embedding, skills), got {value!r}")
+    return weights
+
+
+# hybrid ranking weights of (BM25 over the resume text, skill-embedding cosine, skill overlap)
+HYBRID_WEIGHTS = _parse_weights(os.environ.get("SMARTMATCH_HYBRID_WEIGHTS", "0.4,0.4,0.2"))
+
+
+def normalize_rows(matrix):
+    """Stack embeddings into a float32 matrix with unit-length rows (zero rows stay zero)."""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def score_candidates(query_embedding, candidate_embeddings, normalized=False):
+    """Cosine similarity * 100 of one query against every candidate, as a single matrix-vector product.
+
+    Pass normalized=True when candidate_embeddings already went through normalize_rows.
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32) if normalized else normalize_rows(candidate_embeddings)
+    if candidates.size == 0:
+        return np.empty(0, dtype=np.float32)
+    query = normalize_rows(query_embedding)[0]
+    return candidates @ query * 100
+
+
+def top_k(scores, k=None):
+    """Indices of the k highest scores, best first."""
+    scores = np.asarray(scores)
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def rank_candidates(query_embedding, candidate_embeddings, k=None, threshold=None, normalized=False):
+    """Score and rank candidates; returns (indices, scores) best first.
+
+    With a threshold only candidates scoring at least that much are returned,
+    e.g. threshold=COMPATIBILITY_THRESHOLD for the compatible ones.
+    """
+    scores = score_candidates(query_embedding, candidate_embeddings, normalized=normalized)
+    if threshold is not None:
+        eligible = np.flatnonzero(scores >= threshold)
+        order = eligible[top_k(scores[eligible], k)]
+    else:
+        order = top_k(scores, k)
+    return order, scores[order]
+
+
+def hybrid_scores(bm25_scores, similarities, skill_overlap, weights=HYBRID_WEIGHTS):
+    """Weighted mix of BM25, cosine score and skill overlap fraction, on the 0-100 scale of the cosine score.
+
+    BM25 is divided by the best BM25 among the candidates; negative cosines count as 0.
+    """
+    bm25_scores = np.asarray(bm25_scores, dtype=np.float32)
+    best = bm25_scores.max() if bm25_scores.size else 0
+    components = (
+        bm25_scores / best if best > 0 else np.zeros_like(bm25_scores),
+        np.clip(np.asarray(similarities, dtype=np.float32) / 100, 0, 1),
+        np.asarray(skill_overlap, dtype=np.float32),
+    )
+    total = sum(weights) or 1.0
+    return sum(w * c for w, c in zip(weights, components)) / total * 100
+
+
+def is_compatible(score, threshold=COMPATIBILITY_THRESHOLD):
+    return score >= threshold
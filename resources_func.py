@@ -0,0 +1,67 @@
+import json
+import os
+import threading
+
+import google.generativeai as genai
+
+from extractor_func import get_matcher
+
+
+LIBRARY_PATH = "extractor_library.json"
+
+# Streamlit re-runs home.py on every interaction; everything here is built once per process
+# and shared by all sessions. The library is re-read only when its file changes.
+_lock = threading.Lock()
+_libraries = {}  # path -> {"version": (mtime_ns, size), "library": {...}, "matchers": {...}}
+_genai_api_key = None
+
+
+def _library_entry(path):
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        entry = _libraries.get(path)
+        if entry is None or entry["version"] != version:
+            with open(path, "r") as file:
+                data = json.load(file)
+            # tuples, so no session can change the shared lists
+            entry = {"version": version, "library": {key: tuple(values) for key, values in data.items()}, "matchers": {}}
+            _libraries[path] = entry
+        return entry
+
+
+def load_library(path=LIBRARY_PATH):
+    """The parsed extractor library ({"skills_list": (...), "education_keywords": (...)})."""
+    return _library_entry(path)["library"]
+
+
+def get_skills_list(path=LIBRARY_PATH):
+    return load_library(path)["skills_list"]
+
+
+def get_education_keywords(path=LIBRARY_PATH):
+    return load_library(path)["education_keywords"]
+
+
+def get_library_resource(name, build, path=LIBRARY_PATH):
+    """build(library), e.g. a compiled matcher, built once per process and again only when the library file changes."""
+    entry = _library_entry(path)
+    with _lock:
+        if name not in entry["matchers"]:
+            entry["matchers"][name] = build(entry["library"])
+        return entry["matchers"][name]
+
+
+def get_library_matcher(name, path=LIBRARY_PATH):
+    """Compiled matcher for one keyword list of the library, e.g. "skills_list"; rebuilt when the file changes."""
+    return get_library_resource(name, lambda library: get_matcher(library[name]), path)
+
+
+def configure_genai():
+    """genai.configure with GEMINI_API_KEY, once per process (again only if the key changes)."""
+    global _genai_api_key
+    api_key = os.environ['GEMINI_API_KEY']
+    with _lock:
+        if api_key != _genai_api_key:
+            genai.configure(api_key=api_key)
+            _genai_api_key = api_key
@@ -0,0 +1,115 @@
+import math
+import re
+
+import numpy as np
+
+from ranking_func import normalize_rows
+
+
+CHUNK_MAX_CHARS = 1200
+RETRIEVAL_TOP_K = 8          # chunks put into the prompt at most
+RETRIEVAL_FETCH_K = 24       # candidates fetched from Chroma before MMR re-ranking
+CONTEXT_TOKEN_BUDGET = 3000  # estimated tokens of context per prompt
+MMR_LAMBDA = 0.6             # 1.0 = pure relevance, 0.0 = pure diversity
+
+# resume / JD headings that start a new section when they sit on a line of their own
+SECTION_HEADING = re.compile(
+    r"^\s*(education|experience|work experience|professional experience|internships?|projects?|"
+    r"technical skills|skills|certifications?|achievements|awards|publications|extracurriculars?|"
+    r"summary|objective|profile|about( us| the role)?|your role|your impact|your experience|"
+    r"responsibilities|requirements|qualifications|preferred qualifications|what you.ll do|"
+    r"benefits|salary|compensation)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def estimate_tokens(text):
+    # roughly 4 characters per token for English text
+    return math.ceil(len(text) / 4)
+
+
+def chunk_document(text, max_chars=CHUNK_MAX_CHARS):
+    """Split a resume or JD into section chunks of at most max_chars characters."""
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    starts = [0] + [m.start() for m in SECTION_HEADING.finditer(text) if m.start() > 0]
+    sections = [text[a:b].strip() for a, b in zip(starts, starts[1:] + [len(text)])]
+
+    chunks = []
+    for section in filter(None, sections):
+        current = ""
+        for line in section.splitlines():
+            while len(line) > max_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:max_chars])
+                line = line[max_chars:]
+            if current and len(current) + len(line) + 1 > max_chars:
+                chunks.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current.strip():
+            chunks.append(current)
+    return chunks
+
+
+def mmr(query_embedding, doc_embeddings, k, lambda_=MMR_LAMBDA):
+    """Maximal marginal relevance: indices of k documents that are relevant but not redundant."""
+    docs = normalize_rows(doc_embeddings)
+    if docs.size == 0 or k <= 0:
+        return []
+    relevance = docs @ normalize_rows(query_embedding)[0]
+    similarity = docs @ docs.T
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = similarity[selected[0]].copy()
+    while len(selected) < min(k, len(docs)):
+        scores = lambda_ * relevance - (1 - lambda_) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+
+def retrieve_context(collection, query_embedding, top_k=RETRIEVAL_TOP_K, fetch_k=RETRIEVAL_FETCH_K,
+                     token_budget=CONTEXT_TOKEN_BUDGET, use_mmr=True, lambda_=MMR_LAMBDA):
+    """Pick the chunks for a chat prompt.
+
+    Fetches the fetch_k nearest chunks, optionally re-ranks them with MMR, and
+    keeps the best ones until top_k chunks or token_budget estimated tokens are
+    used. Returns (context, stats) where stats has "chunks" and "tokens".
+    """
+    count = collection.count()
+    if count == 0:
+        return "", {"chunks": 0, "tokens": 0}
+
+    results = collection.query(
+        query_embeddings=[list(map(float, query_embedding))],
+        n_results=min(fetch_k if use_mmr else top_k, count),
+        include=["documents", "metadatas", "embeddings"],
+    )
+    documents = results["documents"][0]
+    metadatas = results["metadatas"][0]
+    order = (
+        mmr(query_embedding, results["embeddings"][0], top_k, lambda_)
+        if use_mmr and len(documents) > 1
+        else range(min(top_k, len(documents)))
+    )
+
+    parts, tokens = [], 0
+    for i in order:
+        source = (metadatas[i] or {}).get("source", "")
+        part = f"[{source}]\n{documents[i]}" if source else documents[i]
+        part_tokens = estimate_tokens(part)
+        if parts and tokens + part_tokens > token_budget:
+            continue
+        parts.append(part)
+        tokens += part_tokens
+        if len(parts) >= top_k:
+            break
+    return "\n\n".join(parts), {"chunks": len(parts), "tokens": tokens}
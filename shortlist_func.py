@@ -0,0 +1,96 @@
+from bm25_func import precompute_bm25_scores
+from database_func import connect_db, score_applications, split_skills
+from query_cache_func import query_cache
+from ranking_func import HYBRID_WEIGHTS
+
+
+SHORTLIST_PAGE_SIZE = 25
+PREFETCH_PAGES = 2  # pages after the visible one scored along with it
+
+# sort label -> ORDER BY expression (the page query's columns); ties go to the earliest application
+SHORTLIST_SORTS = {
+    "Resume Score": "resume_score DESC",
+    "Hybrid Score": "hybrid_score DESC",
+    "Skill Overlap": "skill_overlap DESC",
+    "Experience": "experience_years DESC",
+    "Submitted": "timestamp DESC",
+    "Name": "name COLLATE NOCASE ASC",
+}
+# sorts that need every application scored; the others only score the rows they show
+SCORED_SORTS = {"Resume Score", "Hybrid Score", "Skill Overlap"}
+
+
+def _page_query(columns, sort=None):
+    # hybrid_score is ranking_func.hybrid_scores in SQL, with BM25 relative to the best of all applicants
+    query = f"""
+        SELECT {columns}
+        FROM (
+            SELECT rr.id, s.student_code, s.name, s.email, rr.timestamp, rr.extracted_resume_skills,
+                   rr.resume_score, rr.skill_overlap, rr.degree_level, rr.experience_years,
+                   (:w_bm25 * IFNULL(rr.bm25_score, 0) / :best_bm25
+                    + :w_embedding * MAX(MIN(IFNULL(rr.resume_score, 0) / 100.0, 1), 0)
+                    + :w_skills * IFNULL(rr.skill_overlap, 0) * 1.0 / :jd_skills) / :w_total * 100 AS hybrid_score
+            FROM recruiter_resumes rr
+            JOIN students s ON rr.student_code = s.student_code
+            WHERE rr.recruiter_code = :recruiter_code AND rr.jd_title = :jd_title
+              AND IFNULL(rr.degree_level, 0) >= :min_degree
+              AND (:min_years <= 0 OR rr.experience_years >= :min_years)
+              AND (:min_skills <= 0 OR rr.skill_overlap >= :min_skills)
+        )
+    """
+    if sort is not None:
+        query += f" ORDER BY {SHORTLIST_SORTS[sort]}, id LIMIT :limit OFFSET :offset"
+    return query
+
+
+@query_cache.cached(jd_param="jd_title")
+def fetch_shortlist_page(recruiter_code, jd_title, skills_list, jd_skill_count, page=0, page_size=SHORTLIST_PAGE_SIZE,
+                         sort="Resume Score", min_skills=0, min_degree=0, min_years=0.0, hybrid_weights=None):
+    """One page of a job description's applicants, filtered, sorted and paginated in SQL over the stored scores.
+
+    Scoring is lazy: a sort or minimum on scores scores every application not scored yet,
+    any other sort only this page and the next PREFETCH_PAGES pages. hybrid_weights
+    (BM25, embedding, skills) also fills the BM25 scores. Returns (rows, total) where rows
+    are dicts with the page's applicants.
+    """
+    weights = hybrid_weights or HYBRID_WEIGHTS
+    params = {
+        "recruiter_code": recruiter_code, "jd_title": jd_title,
+        "min_degree": min_degree, "min_years": min_years, "min_skills": min_skills,
+        "w_bm25": weights[0], "w_embedding": weights[1], "w_skills": weights[2], "w_total": sum(weights) or 1.0,
+        "best_bm25": 1.0, "jd_skills": max(jd_skill_count, 1),
+        "limit": page_size, "offset": page * page_size,
+    }
+    if hybrid_weights is not None:
+        params["best_bm25"] = precompute_bm25_scores(recruiter_code, jd_title) or 1.0
+    if sort in SCORED_SORTS or min_skills > 0:
+        score_applications(recruiter_code, jd_title, skills_list)
+    else:
+        # only the rows about to be shown (and the next pages) need scores
+        conn = connect_db()
+        window = [row[0] for row in conn.execute(_page_query("id", sort), {**params, "limit": page_size * (1 + PREFETCH_PAGES)})]
+        conn.close()
+        score_applications(recruiter_code, jd_title, skills_list, window)
+
+    conn = connect_db()
+    c = conn.cursor()
+    c.execute(_page_query("COUNT(*)"), params)
+    total = c.fetchone()[0]
+    c.execute(
+        _page_query(
+            "student_code, name, email, timestamp, extracted_resume_skills, resume_score, hybrid_score, skill_overlap, "
+            "degree_level, experience_years",
+            sort,
+        ),
+        params,
+    )
+    rows = [
+        {
+            "student_code": row[0], "name": row[1], "email": row[2], "timestamp": row[3], "skills": split_skills(row[4]),
+            "resume_score": row[5], "hybrid_score": row[6], "skill_overlap": row[7],
+            "degree_level": row[8] or 0, "experience_years": row[9],
+        }
+        for row in c.fetchall()
+    ]
+    conn.close()
+    return rows, total
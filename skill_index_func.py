@@ -0,0 +1,71 @@
+import numpy as np
+
+from database_func import fetch_job_features
+from query_cache_func import query_cache
+
+
+class SkillIndex:
+    """Inverted index from skill id (position in the skills library) to the items that have the skill.
+
+    Items are applications, job descriptions, ... given as their skill lists;
+    each posting list is a sorted int32 array of item positions. Overlap counts
+    with a query's skills for every item at once are one bincount over the
+    query skills' postings.
+    """
+
+    def __init__(self, skill_lists, skills_list):
+        self.skill_ids = {skill: i for i, skill in enumerate(skills_list)}
+        self.size = len(skill_lists)
+
+        items, skills = [], []
+        for position, item_skills in enumerate(skill_lists):
+            for skill in item_skills:
+                skill_id = self.skill_ids.get(skill)
+                if skill_id is not None:
+                    items.append(position)
+                    skills.append(skill_id)
+        items = np.asarray(items, dtype=np.int32)
+        skills = np.asarray(skills, dtype=np.int32)
+        # group the (item, skill) pairs by skill; a stable sort keeps every posting list sorted by item
+        order = np.argsort(skills, kind="stable")
+        bounds = np.searchsorted(skills[order], np.arange(len(skills_list) + 1))
+        self.postings = [items[order[bounds[i]:bounds[i + 1]]] for i in range(len(skills_list))]
+        self.skill_counts = np.bincount(items, minlength=self.size).astype(np.int32)
+
+    def _ids(self, skills):
+        return sorted({self.skill_ids[skill] for skill in skills if skill in self.skill_ids})
+
+    def posting(self, skill):
+        skill_id = self.skill_ids.get(skill)
+        return self.postings[skill_id] if skill_id is not None else np.empty(0, dtype=np.int32)
+
+    def overlap_counts(self, skills):
+        """Number of the given skills each item has, as an int array over all items."""
+        ids = self._ids(skills)
+        if not ids or self.size == 0:
+            return np.zeros(self.size, dtype=np.int32)
+        return np.bincount(np.concatenate([self.postings[i] for i in ids]), minlength=self.size).astype(np.int32)
+
+    def at_least(self, skills, n, counts=None):
+        """Positions of the items having at least n of the given skills (counts: overlap_counts(skills), if known)."""
+        if n <= 0:
+            return np.arange(self.size)
+        counts = self.overlap_counts(skills) if counts is None else counts
+        return np.flatnonzero(counts >= n)
+
+    def shared_skills(self, position, skills):
+        """The given skills that the item at position has, in the given order."""
+        shared = []
+        for skill in skills:
+            posting = self.posting(skill)
+            i = np.searchsorted(posting, position)
+            if i < len(posting) and posting[i] == position:
+                shared.append(skill)
+        return shared
+
+
+@query_cache.cached()
+def fetch_job_index(recruiter_code, skills_list):
+    """(job descriptions, SkillIndex over their required skills) of a recruiter."""
+    jobs = fetch_job_features(recruiter_code, skills_list)
+    return jobs, SkillIndex([job["skills"] for job in jobs], skills_list)